@@ -0,0 +1,289 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# Offline benchmark of the translation pipeline. A tiny randomly initialized MarianMT model and
+# tokenizer are built locally, so no download is needed and runs are comparable across machines
+# and commits. The numbers measure this code's overhead and scaling, not translation quality.
+#
+#   python -m benchmark --output results.json
+#   python -m benchmark --baseline results.json --tolerance 0.15
+
+WORDS = (
+    "the a report meeting train city river morning customer order price window letter doctor "
+    "garden station table company program weather children answer question market evening "
+    "is was has will can should opened closed arrived left changed signed read wrote found "
+    "quickly today yesterday always never again carefully outside inside before after"
+).split()
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Metrics where a larger value is better; everything else is better when smaller
+HIGHER_IS_BETTER = {'batch_segments_per_second', 'batch_tokens_per_second', 'pdf_pages_per_second',
+                    'long_encoder_seconds_saved', 'long_encoder_saved_share'}
+
+
+def make_sentences(count, seed, min_words=6, max_words=18):
+    # Distinct sentences, so the translation memory never answers for the model
+    rng = random.Random(seed)
+    sentences = []
+    for i in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+        sentences.append(f"{' '.join(words).capitalize()} {seed}-{i}.")
+    return sentences
+
+
+def build_tiny_model(model_dir, d_model=64, layers=2, vocab_size=120, seed=0):
+    # Writes a MarianMT checkpoint and a MarianTokenizer with sentencepiece vocabularies to model_dir
+    import sentencepiece as spm
+    import torch
+    from transformers import MarianConfig, MarianMTModel, MarianTokenizer
+
+    os.makedirs(model_dir, exist_ok=True)
+    corpus_path = os.path.join(model_dir, "corpus.txt")
+    with open(corpus_path, "w", encoding="utf-8") as corpus:
+        corpus.write("\n".join(make_sentences(2000, seed)))
+
+    spm.SentencePieceTrainer.train(input=corpus_path, model_prefix=os.path.join(model_dir, "spm"),
+                                   vocab_size=vocab_size, model_type="unigram", minloglevel=2)
+    processor = spm.SentencePieceProcessor(model_file=os.path.join(model_dir, "spm.model"))
+    vocab = {"</s>": 0, "<unk>": 1, "<pad>": 2}
+    for piece_id in range(processor.get_piece_size()):
+        vocab.setdefault(processor.id_to_piece(piece_id), len(vocab))
+    with open(os.path.join(model_dir, "vocab.json"), "w", encoding="utf-8") as vocab_file:
+        json.dump(vocab, vocab_file)
+
+    spm_path = os.path.join(model_dir, "spm.model")
+    tokenizer = MarianTokenizer(source_spm=spm_path, target_spm=spm_path, vocab=os.path.join(model_dir, "vocab.json"))
+    tokenizer.save_pretrained(model_dir)
+
+    torch.manual_seed(seed)
+    config = MarianConfig(
+        vocab_size=len(vocab), d_model=d_model, encoder_layers=layers, decoder_layers=layers,
+        encoder_attention_heads=4, decoder_attention_heads=4, encoder_ffn_dim=d_model * 4, decoder_ffn_dim=d_model * 4,
+        max_position_embeddings=512, pad_token_id=2, eos_token_id=0, decoder_start_token_id=2,
+        max_length=512, num_beams=4,
+    )
+    MarianMTModel(config).save_pretrained(model_dir)
+    return model_dir
+
+
+def make_pdf(path, pages, sentences_per_page=12, seed=1):
+    import fitz
+
+    sentences = make_sentences(pages * sentences_per_page, seed)
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        text = " ".join(sentences[page_number * sentences_per_page:(page_number + 1) * sentences_per_page])
+        page.insert_textbox(fitz.Rect(72, 72, page.rect.width - 72, page.rect.height - 72), text, fontsize=11)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure_encoder_reuse(translator, segments):
+    # Decodes the same long segments twice with different decoding profiles, which the translation
+    # memory keeps apart; the second pass takes its encoder outputs from the encoder cache
+    cache = translator.encoder_cache
+    if cache is None:
+        return {}
+    results = {}
+    encode_before = cache.encode_seconds
+    start = time.perf_counter()
+    translator.translate_batch(segments, 'english', 'french', decoding='fast')
+    results['long_first_pass_seconds'] = round(time.perf_counter() - start, 4)
+    results['long_encoder_seconds'] = round(cache.encode_seconds - encode_before, 4)
+
+    saved_before = cache.saved_seconds
+    start = time.perf_counter()
+    translator.translate_batch(segments, 'english', 'french', decoding='balanced')
+    elapsed = time.perf_counter() - start
+    saved = cache.saved_seconds - saved_before
+    results['long_second_pass_seconds'] = round(elapsed, 4)
+    results['long_encoder_seconds_saved'] = round(saved, 4)
+    # Share of the second pass the encoder would have added without the cache
+    results['long_encoder_saved_share'] = round(saved / (elapsed + saved), 4)
+    return results
+
+
+def run_benchmark(work_dir, latency_runs=30, batch_segments=256, pdf_pages=20, decoding='balanced',
+                  inference_profile='default', d_model=64, layers=2, long_segments=32):
+    import pdf_utils
+    from translator import TextTranslator
+
+    model_dir = build_tiny_model(os.path.join(work_dir, "model"), d_model=d_model, layers=layers)
+
+    class LocalModelTranslator(TextTranslator):
+        # Every language pair resolves to the locally built model
+        def get_model_name(self, src_lang, dest_lang):
+            return model_dir
+
+    translator = LocalModelTranslator(cache_dir=os.path.join(work_dir, "cache"), inference_profile=inference_profile,
+                                      decoding_profile=decoding)
+    results = {}
+
+    start = time.perf_counter()
+    translator.load_model('english', 'french')
+    results['cold_load_seconds'] = round(time.perf_counter() - start, 4)
+
+    # Warm single-segment latency, the interactive path
+    latencies = []
+    for sentence in make_sentences(latency_runs, seed=2):
+        start = time.perf_counter()
+        translator.translate_text(sentence, 'english', 'french')
+        latencies.append((time.perf_counter() - start) * 1000)
+    results['warm_latency_ms_p50'] = round(percentile(latencies, 0.5), 2)
+    results['warm_latency_ms_p99'] = round(percentile(latencies, 0.99), 2)
+
+    # Batched throughput, the bulk path
+    sentences = make_sentences(batch_segments, seed=3)
+    stats_before = dict(translator.stats)
+    start = time.perf_counter()
+    translator.translate_batch(sentences, 'english', 'french')
+    elapsed = time.perf_counter() - start
+    tokens = translator.stats['tokens_in'] + translator.stats['tokens_out'] - stats_before['tokens_in'] - stats_before['tokens_out']
+    results['batch_segments_per_second'] = round(batch_segments / elapsed, 2)
+    results['batch_tokens_per_second'] = round(tokens / elapsed, 1)
+    # Tokenization and generation timed separately, to track tokenization's share
+    results['batch_tokenize_seconds'] = round(translator.stats['tokenize_seconds'] - stats_before['tokenize_seconds'], 4)
+    results['batch_generate_seconds'] = round(translator.stats['generate_seconds'] - stats_before['generate_seconds'], 4)
+
+    # Encoder reuse when long segments are decoded again
+    results.update(measure_encoder_reuse(translator, make_sentences(long_segments, seed=4, min_words=150, max_words=220)))
+
+    # End-to-end PDF extraction, translation and writing
+    if pdf_utils.FITZ_AVAILABLE:
+        input_path = make_pdf(os.path.join(work_dir, "input.pdf"), pdf_pages)
+        start = time.perf_counter()
+        pdf_utils.translate_pdf(input_path, os.path.join(work_dir, "output.pdf"), 'english', 'french',
+                                text_translator=translator)
+        results['pdf_pages_per_second'] = round(pdf_pages / (time.perf_counter() - start), 3)
+
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def measure_startup(timeout=120):
+    # Time until the GUI window is drawn (None without a display), and the cost of importing
+    # the translator, which the GUI now pays on a background thread instead of before the window
+    results = {}
+    env = dict(os.environ, TRANSLATOR_STARTUP_PROBE='1', TRANSLATOR_PREWARM='')
+    try:
+        probe = subprocess.run([sys.executable, os.path.join(APP_DIR, "main.py")], cwd=APP_DIR, env=env,
+                               capture_output=True, text=True, timeout=timeout)
+        # The probe's own measurement, from the top of main.py to the drawn window, so interpreter
+        # startup and tearing the window down again are not counted
+        window_lines = [line for line in probe.stdout.splitlines() if line.startswith("startup_window_seconds=")]
+        results['startup_window_seconds'] = (round(float(window_lines[-1].split("=", 1)[1]), 3)
+                                             if probe.returncode == 0 and window_lines else None)
+    except subprocess.TimeoutExpired:
+        results['startup_window_seconds'] = None
+
+    code = "import time; start = time.perf_counter(); import translator; print(time.perf_counter() - start)"
+    probe = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, capture_output=True, text=True, timeout=timeout)
+    results['translator_import_seconds'] = round(float(probe.stdout.strip().splitlines()[-1]), 3) if probe.returncode == 0 else None
+    return results
+
+
+def environment():
+    import torch
+    import transformers
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'torch': torch.__version__,
+        'torch_threads': torch.get_num_threads(),
+        'transformers': transformers.__version__,
+    }
+
+
+def compare(results, baseline, tolerance):
+    # Metrics that moved the wrong way by more than tolerance (a fraction) relative to the baseline
+    regressions = []
+    for name, value in results.items():
+        previous = baseline.get(name)
+        if value is None or not previous:
+            continue
+        change = (value - previous) / previous
+        if (name in HIGHER_IS_BETTER and change < -tolerance) or (name not in HIGHER_IS_BETTER and change > tolerance):
+            regressions.append({'metric': name, 'baseline': previous, 'value': value, 'change': round(change, 3)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmark", description="Offline throughput and latency benchmark on a tiny local model.")
+    parser.add_argument("--output", help="write the results as JSON to this file (default: stdout)")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative slowdown before a metric counts as a regression (default: 0.10)")
+    parser.add_argument("--latency-runs", type=int, default=30)
+    parser.add_argument("--batch-segments", type=int, default=256)
+    parser.add_argument("--pdf-pages", type=int, default=20)
+    parser.add_argument("--long-segments", type=int, default=32, help="long segments decoded twice to measure encoder reuse (default: 32)")
+    parser.add_argument("--decoding", choices=("fast", "balanced", "quality"), default="balanced")
+    parser.add_argument("--inference-profile", choices=("default", "int8"), default="default")
+    parser.add_argument("--d-model", type=int, default=64, help="hidden size of the generated model (default: 64)")
+    parser.add_argument("--layers", type=int, default=2, help="encoder and decoder layers of the generated model (default: 2)")
+    parser.add_argument("--skip-startup", action="store_true", help="do not measure GUI startup and import time")
+    args = parser.parse_args(argv)
+
+    config = {
+        'latency_runs': args.latency_runs, 'batch_segments': args.batch_segments, 'pdf_pages': args.pdf_pages,
+        'decoding': args.decoding, 'inference_profile': args.inference_profile, 'd_model': args.d_model, 'layers': args.layers,
+        'long_segments': args.long_segments,
+    }
+    # Translator progress goes to stderr so stdout only carries the JSON
+    with tempfile.TemporaryDirectory(prefix="translator-benchmark-") as work_dir, contextlib.redirect_stdout(sys.stderr):
+        results = run_benchmark(work_dir, args.latency_runs, args.batch_segments, args.pdf_pages, args.decoding,
+                                args.inference_profile, args.d_model, args.layers, args.long_segments)
+        if not args.skip_startup:
+            results.update(measure_startup())
+    report = {'environment': environment(), 'config': config, 'results': results}
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('config') != config:
+            print("Warning: baseline was run with a different configuration", file=sys.stderr)
+        report['regressions'] = compare(results, baseline.get('results', {}), args.tolerance)
+        for regression in report['regressions']:
+            print(f"REGRESSION {regression['metric']}: {regression['baseline']} -> {regression['value']} "
+                  f"({regression['change']:+.1%})", file=sys.stderr)
+        exit_code = 1 if report['regressions'] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(text + "\n")
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
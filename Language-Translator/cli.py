@@ -0,0 +1,319 @@
+import argparse
+import contextlib
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Headless entry point; nothing here may import tkinter so it runs on servers without a display.
+#
+#   python -m cli text --dest french < input.txt > output.txt
+#   python -m cli pdf input.pdf output.pdf --dest de
+#   python -m cli pdf long.pdf output.pdf --dest de --resume
+#   python -m cli batch input_dir/ output_dir/ --dest spanish --workers 2
+#   python -m cli fanout input.pdf output_dir/ --dest fr,de,es
+#   python -m cli table products.csv products.de.csv --columns name,description --dest de
+
+
+class ThroughputReport:
+    def __init__(self, translator, pool=None):
+        self.translator = translator
+        self.pool = pool
+        self.start_time = time.perf_counter()
+        self.start_stats = self._snapshot()
+        self.lock = threading.Lock()
+        self.pages = 0
+        self.files = 0
+        self.failures = 0
+
+    def add_page(self):
+        with self.lock:
+            self.pages += 1
+
+    def _snapshot(self):
+        totals = {'segments': 0, 'tokens_in': 0, 'tokens_out': 0, 'tokenize_seconds': 0.0, 'generate_seconds': 0.0}
+        # Work done in worker processes is counted by the pool, not the local translator
+        for source in (self.translator, self.pool):
+            stats = getattr(source, 'stats', None)
+            if stats:
+                for key in totals:
+                    totals[key] += stats[key]
+        return totals
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9)
+        end_stats = self._snapshot()
+        segments = end_stats['segments'] - self.start_stats['segments']
+        tokens = (end_stats['tokens_in'] - self.start_stats['tokens_in']) + (end_stats['tokens_out'] - self.start_stats['tokens_out'])
+        tokenize_seconds = end_stats['tokenize_seconds'] - self.start_stats['tokenize_seconds']
+        generate_seconds = end_stats['generate_seconds'] - self.start_stats['generate_seconds']
+        return {
+            'files': self.files,
+            'failures': self.failures,
+            'pages': self.pages,
+            'segments': segments,
+            'tokens': tokens,
+            'seconds': round(elapsed, 3),
+            'pages_per_second': round(self.pages / elapsed, 3),
+            'segments_per_second': round(segments / elapsed, 3),
+            'tokens_per_second': round(tokens / elapsed, 3),
+            'tokenize_seconds': round(tokenize_seconds, 3),
+            'generate_seconds': round(generate_seconds, 3),
+        }
+
+    def print(self, stream=sys.stderr):
+        summary = self.summary()
+        print("Translation report:", file=stream)
+        print(f"  files:        {summary['files']} ({summary['failures']} failed)", file=stream)
+        print(f"  pages:        {summary['pages']}", file=stream)
+        print(f"  segments:     {summary['segments']}", file=stream)
+        print(f"  tokens:       {summary['tokens']}", file=stream)
+        print(f"  elapsed:      {summary['seconds']:.2f}s", file=stream)
+        print(f"  throughput:   {summary['pages_per_second']:.2f} pages/s, "
+              f"{summary['segments_per_second']:.2f} segments/s, {summary['tokens_per_second']:.1f} tokens/s", file=stream)
+        model_seconds = summary['tokenize_seconds'] + summary['generate_seconds']
+        if summary['generate_seconds']:
+            print(f"  tokenize:     {summary['tokenize_seconds']:.2f}s ({summary['tokenize_seconds'] / model_seconds:.1%} of "
+                  f"tokenize + generate)", file=stream)
+
+
+def translate_text_stream(translator, text, src, dest, pool=None):
+    from segmenter import segment_text, join_segments
+
+    segments = segment_text(text, translator.get_token_counter(src, dest))
+    if pool is not None:
+        translated = pool.translate_segments([segment.text for segment in segments])
+    else:
+        translated = translator.translate_batch([segment.text for segment in segments], src, dest)
+    return join_segments(text, segments, translated)
+
+
+def translate_file(translator, input_path, output_path, src, dest, window, report, pool=None, layout=False, fontfile=None):
+    import pdf_utils
+
+    if input_path.lower().endswith('.pdf'):
+        def count_page(page_number, translated_page):
+            report.add_page()
+
+        if layout:
+            # Translates in place over the original pages; runs in this process even with --processes
+            from layout import translate_pdf_layout
+            written = translate_pdf_layout(input_path, output_path, src, dest, window=window, text_translator=translator,
+                                           fontfile=fontfile, page_callback=count_page)
+        elif pool is not None:
+            written = pool.translate_pdf(input_path, output_path, window=window, page_callback=count_page)
+        else:
+            written = pdf_utils.translate_pdf(input_path, output_path, src, dest, window=window,
+                                              page_callback=count_page, text_translator=translator)
+        if not written:
+            raise RuntimeError(f"could not write {output_path}")
+    else:
+        with open(input_path, encoding='utf-8') as source:
+            text = source.read()
+        translated = translate_text_stream(translator, text, src, dest, pool)
+        with open(output_path, 'w', encoding='utf-8') as target:
+            target.write(translated)
+
+
+def run_text(args, translator, report):
+    text = sys.stdin.read()
+    # Translator progress goes to stderr so stdout only carries the translation
+    with contextlib.redirect_stdout(sys.stderr):
+        translated = translate_text_stream(translator, text, args.src, args.dest)
+    sys.stdout.write(translated)
+    if not translated.endswith('\n'):
+        sys.stdout.write('\n')
+    report.files += 1
+
+
+def translate_pdf_resumable(translator, input_path, output_path, src, dest, window, report):
+    # Checkpoints every window in the job store; after an interrupt (e.g. Ctrl-C) the same
+    # command continues from the first unfinished page
+    import jobs
+    import pdf_utils
+
+    def count_page(page_number, page_count, translated_page, resumed):
+        if not resumed:
+            report.add_page()
+
+    store = jobs.JobStore(getattr(translator, 'model_cache_dir', None))
+    job_id = jobs.run_pdf_job(store, input_path, src, dest, translator, window=window, page_callback=count_page)
+    if not pdf_utils.write_pdf(store.translated_pages(job_id), output_path):
+        raise RuntimeError(f"could not write {output_path}")
+
+
+def run_pdf(args, translator, report):
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.resume:
+            translate_pdf_resumable(translator, args.input, args.output, args.src, args.dest, args.window, report)
+            report.files += 1
+            return
+        translate_file(translator, args.input, args.output, args.src, args.dest, args.window, report, args.pool,
+                       args.layout, args.font)
+    report.files += 1
+
+
+def run_batch(args, translator, report):
+    extensions = tuple(ext if ext.startswith('.') else '.' + ext for ext in args.extensions.split(','))
+    inputs = sorted(
+        name for name in os.listdir(args.input_dir)
+        if name.lower().endswith(extensions) and os.path.isfile(os.path.join(args.input_dir, name))
+    )
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"Translating {len(inputs)} files with {args.workers} workers", file=sys.stderr)
+
+    def work(name):
+        translate_file(translator, os.path.join(args.input_dir, name), os.path.join(args.output_dir, name),
+                       args.src, args.dest, args.window, report, args.pool, args.layout, args.font)
+        return name
+
+    with contextlib.redirect_stdout(sys.stderr):
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(work, name): name for name in inputs}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    future.result()
+                    report.files += 1
+                    print(f"Finished {name}", file=sys.stderr)
+                except Exception as e:
+                    report.failures += 1
+                    print(f"Failed {name}: {e}", file=sys.stderr)
+
+
+def run_fanout(args, translator, report):
+    from fanout import translate_document_multi
+
+    def count_pages(dest, pages_done, page_count):
+        print(f"{dest}: {pages_done}/{page_count} pages", file=sys.stderr)
+
+    with contextlib.redirect_stdout(sys.stderr):
+        outputs = translate_document_multi(args.input, args.output_dir, args.src, args.dest_langs, window=args.window,
+                                           workers=args.workers, text_translator=translator, decoding=args.decoding,
+                                           page_callback=count_pages, extract_processes=None)
+        import pdf_utils
+        page_count = pdf_utils.count_pdf_pages(args.input)
+    report.files += len(outputs)
+    report.failures += len(args.dest_langs) - len(outputs)
+    with report.lock:
+        report.pages += page_count * len(outputs)
+    for dest, path in outputs.items():
+        print(f"{dest}: {path}")
+
+
+def run_table(args, translator, report):
+    from tabular import translate_table
+
+    def show_progress(stats):
+        print(f"{stats.rows} rows, {stats.unique} unique values", file=sys.stderr)
+
+    columns = [column.strip() for column in args.columns.split(',') if column.strip()]
+    with contextlib.redirect_stdout(sys.stderr):
+        stats = translate_table(args.input, args.output, columns, args.src, args.dest, translator, chunk_rows=args.chunk_rows,
+                                batch_size=args.batch_size, decoding=args.decoding, progress_callback=show_progress)
+    report.files += 1
+    if not args.no_report:
+        summary = stats.summary()
+        print(f"Table: {summary['rows']} rows, {summary['cells']} cells, {summary['unique_values']} unique values "
+              f"(dedup ratio {summary['dedup_ratio']:.1%}), {summary['rows_per_second']:.1f} rows/s, "
+              f"{summary['cells_per_second']:.1f} cells/s", file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Translate text, PDFs or whole directories without the GUI.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_layout_options(subparser):
+        subparser.add_argument("--layout", action="store_true", help="keep the original page layout, replacing text block by block")
+        subparser.add_argument("--font", help="TTF/OTF font covering the target script, used with --layout")
+
+    def add_language_options(subparser):
+        subparser.add_argument("--src", default="english", help="source language name or ISO code (default: english)")
+        subparser.add_argument("--dest", required=True, help="target language name or ISO code")
+        subparser.add_argument("--decoding", choices=("fast", "balanced", "quality"), default="balanced",
+                               help="search setting: greedy, small beam or the checkpoint's full beam (default: balanced)")
+        subparser.add_argument("--no-report", action="store_true", help="do not print the throughput report")
+
+    text_parser = subparsers.add_parser("text", help="translate stdin to stdout")
+    add_language_options(text_parser)
+    text_parser.set_defaults(handler=run_text)
+
+    pdf_parser = subparsers.add_parser("pdf", help="translate one PDF file")
+    pdf_parser.add_argument("input")
+    pdf_parser.add_argument("output")
+    add_language_options(pdf_parser)
+    pdf_parser.add_argument("--window", type=int, default=4, help="pages translated per batch (default: 4)")
+    pdf_parser.add_argument("--processes", type=int, default=0, help="translate page ranges in this many worker processes (default: off)")
+    pdf_parser.add_argument("--resume", action="store_true",
+                            help="checkpoint finished pages and continue an interrupted run of the same file and language")
+    add_layout_options(pdf_parser)
+    pdf_parser.set_defaults(handler=run_pdf)
+
+    batch_parser = subparsers.add_parser("batch", help="translate every PDF/text file in a directory")
+    batch_parser.add_argument("input_dir")
+    batch_parser.add_argument("output_dir")
+    add_language_options(batch_parser)
+    batch_parser.add_argument("--workers", type=int, default=1, help="files translated concurrently (default: 1)")
+    batch_parser.add_argument("--extensions", default=".pdf,.txt", help="comma-separated file extensions (default: .pdf,.txt)")
+    batch_parser.add_argument("--window", type=int, default=4, help="pages translated per batch (default: 4)")
+    batch_parser.add_argument("--processes", type=int, default=0, help="share this many worker processes across all files (default: off)")
+    add_layout_options(batch_parser)
+    batch_parser.set_defaults(handler=run_batch)
+
+    fanout_parser = subparsers.add_parser("fanout", help="translate one PDF into several languages (--dest fr,de,es)")
+    fanout_parser.add_argument("input")
+    fanout_parser.add_argument("output_dir")
+    add_language_options(fanout_parser)
+    fanout_parser.add_argument("--workers", type=int, default=1, help="windows translated concurrently (default: 1)")
+    fanout_parser.add_argument("--window", type=int, default=8, help="pages translated per batch (default: 8)")
+    fanout_parser.set_defaults(handler=run_fanout)
+
+    table_parser = subparsers.add_parser("table", help="translate columns of a CSV/TSV/JSONL/Parquet file")
+    table_parser.add_argument("input")
+    table_parser.add_argument("output")
+    table_parser.add_argument("--columns", required=True, help="comma-separated names of the columns (or JSON keys) to translate")
+    add_language_options(table_parser)
+    table_parser.add_argument("--chunk-rows", type=int, default=10000, help="rows read and written per chunk (default: 10000)")
+    table_parser.add_argument("--batch-size", type=int, default=64, help="values per model batch (default: 64)")
+    table_parser.set_defaults(handler=run_table)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not any(dest.strip() for dest in args.dest.split(',')):
+        parser.error("--dest needs at least one language")
+    # Resumable jobs translate in this process with the plain text layout
+    if getattr(args, 'resume', False) and (args.processes or args.layout or args.font):
+        parser.error("--resume cannot be combined with --processes, --layout or --font")
+
+    with contextlib.redirect_stdout(sys.stderr):
+        from translator import get_translator, language_name
+        translator = get_translator()
+    translator.decoding_profile = args.decoding
+    args.src = language_name(args.src)
+    args.dest_langs = [language_name(dest) for dest in args.dest.split(',') if dest.strip()]
+    args.dest = args.dest_langs[0]
+
+    args.pool = None
+    if getattr(args, 'processes', 0):
+        from parallel import TranslationPool
+        with contextlib.redirect_stdout(sys.stderr):
+            args.pool = TranslationPool(args.src, args.dest, args.processes, decoding=args.decoding)
+
+    report = ThroughputReport(translator, args.pool)
+    try:
+        args.handler(args, translator, report)
+    finally:
+        if args.pool is not None:
+            args.pool.close()
+    if not args.no_report:
+        report.print()
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+from transformers.modeling_outputs import BaseModelOutput
+
+from metrics import metrics
+
+# Encoder outputs of recently translated segments, so decoding the same segments again with the
+# same model (a retry with another decoding profile, a second pass over a document) skips the
+# encoder. Outputs are stored per segment, without padding, so they are reused whatever batch a
+# segment lands in; a batch is reassembled by padding the cached states back to a common length.
+
+
+class EncoderCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Encoder time spent, and the time the hits would have cost (each entry remembers its
+        # share of the batch it was computed in)
+        self.encode_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def _get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[1]
+            return entry[0]
+
+    def _put(self, key, hidden_state, seconds):
+        size = hidden_state.element_size() * hidden_state.nelement()
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            self.entries[key] = (hidden_state, seconds, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+
+    def encode(self, model, model_key, input_ids, attention_mask):
+        # Encoder outputs for a right-padded batch, computing only the segments not in the cache.
+        # Returns a BaseModelOutput to pass to model.generate(encoder_outputs=...).
+        lengths = attention_mask.sum(dim=1).tolist()
+        keys = [(model_key, tuple(ids[:length].tolist())) for ids, length in zip(input_ids, lengths)]
+        states = [self._get(key) for key in keys]
+
+        missing = [i for i, state in enumerate(states) if state is None]
+        metrics.increment('encoder_cache_hits_total', len(keys) - len(missing))
+        if missing:
+            metrics.increment('encoder_cache_misses_total', len(missing))
+            width = max(lengths[i] for i in missing)
+            start = time.perf_counter()
+            with metrics.timer('stage_seconds', stage='encode'):
+                hidden = model.get_encoder()(input_ids=input_ids[missing, :width],
+                                             attention_mask=attention_mask[missing, :width]).last_hidden_state
+            elapsed = time.perf_counter() - start
+            total_tokens = sum(lengths[i] for i in missing)
+            with self.lock:
+                self.encode_seconds += elapsed
+            for row, i in enumerate(missing):
+                # clone() so the cached slice does not keep the whole batch tensor alive
+                states[i] = hidden[row, :lengths[i]].clone()
+                self._put(keys[i], states[i], elapsed * lengths[i] / total_tokens)
+
+        padded = states[0].new_zeros((len(states), input_ids.shape[1], states[0].shape[-1]))
+        for i, state in enumerate(states):
+            padded[i, :state.shape[0]] = state
+        return BaseModelOutput(last_hidden_state=padded)
+
+
+def generate_with_encoder_cache(model, cache, model_key, batch, **kwargs):
+    # model.generate with the encoder run through the cache and the decoder's key/value cache on
+    encoder_outputs = cache.encode(model, model_key, batch['input_ids'], batch['attention_mask'])
+    return model.generate(encoder_outputs=encoder_outputs, attention_mask=batch['attention_mask'], use_cache=True, **kwargs)
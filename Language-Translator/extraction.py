@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# PDF text extraction for long documents. Page ranges can be split across worker processes, each
+# opening its own fitz document; every page yields its plain text and its text blocks with
+# bounding boxes, and pages that only hold images are flagged and skipped. Results are cached on
+# disk by file hash and page number, so translating the same document again (e.g. into another
+# language) does not extract it again.
+
+logger = logging.getLogger('extraction')
+
+# Bump when the stored page format changes, so old cache entries are ignored
+EXTRACTION_VERSION = 1
+
+# Below this many pages per process, starting processes (each re-imports the main module under
+# spawn) costs more than it saves
+MIN_PAGES_PER_PROCESS = 100
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PageExtraction:
+    __slots__ = ('page_number', 'text', 'blocks', 'image_only')
+
+    def __init__(self, page_number, text, blocks, image_only):
+        self.page_number = page_number
+        self.text = text
+        # [(x0, y0, x1, y1, text), ...] in reading order
+        self.blocks = blocks
+        self.image_only = image_only
+
+
+def _extract_page(page):
+    # One text page parse serves both the plain text and the blocks
+    textpage = page.get_textpage()
+    text = page.get_text("text", textpage=textpage)
+    if not text.strip():
+        # No text layer: a scan or picture page, nothing to translate
+        return PageExtraction(page.number, "", [], bool(page.get_images(full=False)))
+    blocks = [(x0, y0, x1, y1, block_text)
+              for x0, y0, x1, y1, block_text, _, block_type in page.get_text("blocks", textpage=textpage)
+              if block_type == 0 and block_text.strip()]
+    return PageExtraction(page.number, text, blocks, False)
+
+
+def _extract_range(path, page_numbers):
+    # Runs in a worker process; returns plain tuples so results pickle cheaply
+    import fitz
+
+    with fitz.open(path) as doc:
+        results = []
+        for page_number in page_numbers:
+            page = _extract_page(doc[page_number])
+            results.append((page.page_number, page.text, page.blocks, page.image_only))
+        return results
+
+
+class ExtractionCache:
+    def __init__(self, cache_dir=None, filename="extraction.sqlite", max_age_days=30):
+        cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".cache", "language_translator_models")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(cache_dir, filename), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "document_hash TEXT NOT NULL, version INTEGER NOT NULL, page_number INTEGER NOT NULL, "
+            "text TEXT NOT NULL, blocks TEXT NOT NULL, image_only INTEGER NOT NULL, used REAL NOT NULL, "
+            "PRIMARY KEY (document_hash, version, page_number))"
+        )
+        self.db.commit()
+        self.prune(max_age_days)
+
+    def get(self, document_hash, page_numbers):
+        # {page_number: PageExtraction} for those of the given pages that are cached
+        page_numbers = list(page_numbers)
+        if not page_numbers:
+            return {}
+        placeholders = ",".join("?" * len(page_numbers))
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT page_number, text, blocks, image_only FROM pages "
+                f"WHERE document_hash = ? AND version = ? AND page_number IN ({placeholders})",
+                (document_hash, EXTRACTION_VERSION, *page_numbers),
+            ).fetchall()
+            if rows:
+                self.db.execute(f"UPDATE pages SET used = ? WHERE document_hash = ? AND page_number IN ({placeholders})",
+                                (time.time(), document_hash, *page_numbers))
+                self.db.commit()
+        return {row[0]: PageExtraction(row[0], row[1], [tuple(block) for block in json.loads(row[2])], bool(row[3]))
+                for row in rows}
+
+    def put(self, document_hash, pages):
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(document_hash, EXTRACTION_VERSION, page.page_number, page.text, json.dumps(page.blocks),
+                  int(page.image_only), now) for page in pages],
+            )
+            self.db.commit()
+
+    def prune(self, max_age_days):
+        cutoff = time.time() - max_age_days * 24 * 3600
+        with self.lock:
+            self.db.execute("DELETE FROM pages WHERE used < ? OR version != ?", (cutoff, EXTRACTION_VERSION))
+            self.db.commit()
+
+
+# One cache per cache directory, shared by every caller in the process
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+def get_cache(cache_dir=None):
+    with _shared_caches_lock:
+        if cache_dir not in _shared_caches:
+            _shared_caches[cache_dir] = ExtractionCache(cache_dir)
+        return _shared_caches[cache_dir]
+
+
+def extract_pages(path, page_numbers=None, processes=1, cache=None, document_hash=None, use_cache=True):
+    # Returns a PageExtraction for each of the given 0-based pages (all pages by default), in order.
+    # document_hash saves hashing the file again when the caller already has it.
+    # processes=None uses the physical cores for large documents. The pool uses spawn, which
+    # re-imports the __main__ module in every worker, so only ask for it from entry points behind
+    # an `if __name__ == "__main__"` guard (cli, benchmark), never from the GUI.
+    if page_numbers is None:
+        import fitz
+
+        with fitz.open(path) as doc:
+            page_numbers = list(range(doc.page_count))
+    else:
+        page_numbers = list(page_numbers)
+
+    pages = {}
+    if use_cache:
+        cache = cache or get_cache()
+        document_hash = document_hash or file_hash(path)
+        pages = cache.get(document_hash, page_numbers)
+    missing = [page_number for page_number in page_numbers if page_number not in pages]
+
+    if missing:
+        if processes is None:
+            from parallel import physical_core_count
+            processes = physical_core_count()
+        processes = min(processes, max(1, len(missing) // MIN_PAGES_PER_PROCESS))
+        start_time = time.perf_counter()
+        if processes <= 1:
+            extracted = _extract_range(path, missing)
+        else:
+            # Several chunks per process so a slow stretch of pages does not hold up the rest
+            chunk_size = max(MIN_PAGES_PER_PROCESS // 4, len(missing) // (processes * 4) + 1)
+            chunks = [missing[start:start + chunk_size] for start in range(0, len(missing), chunk_size)]
+            with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as executor:
+                extracted = [page for result in executor.map(_extract_range, [path] * len(chunks), chunks) for page in result]
+        new_pages = [PageExtraction(*page) for page in extracted]
+        for page in new_pages:
+            pages[page.page_number] = page
+        logger.debug("Extracted %d pages in %.2fs with %d processes (%d image-only pages skipped)", len(new_pages),
+                     time.perf_counter() - start_time, processes, sum(page.image_only for page in new_pages))
+        if use_cache:
+            cache.put(document_hash, new_pages)
+
+    return [pages[page_number] for page_number in page_numbers]
@@ -0,0 +1,91 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import extraction
+import pdf_utils
+from segmenter import segment_text, join_segments
+from translator import get_translator, LANGUAGE_CODE_MAP
+
+# Translates one document into several target languages. The source is extracted and
+# segmented once; each window of pages is then translated into all targets together, so the
+# English pivot hop is shared and the target models stay loaded while the job runs.
+
+
+def output_path_for(input_path, output_dir, dest_lang):
+    reverse_codes = {name: code for code, name in LANGUAGE_CODE_MAP.items()}
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f"{stem}.{reverse_codes.get(dest_lang, dest_lang)}.pdf")
+
+
+def translate_document_multi(input_path, output_dir, src, dest_langs, window=8, workers=1,
+                             text_translator=None, decoding=None, page_callback=None, extract_processes=1):
+    # Returns {dest_lang: output_path} for the PDFs that were written.
+    # page_callback(dest_lang, pages_done, page_count) is called as windows finish.
+    # extract_processes=None extracts large documents in a process pool, see extraction.extract_pages.
+    translator = text_translator or get_translator()
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Extract and segment the source once for every target
+    # Cached: each further run on the same document skips extraction
+    extraction_cache = extraction.get_cache(getattr(translator, 'model_cache_dir', None))
+    page_texts = [page.text for page in extraction.extract_pages(input_path, processes=extract_processes, cache=extraction_cache)]
+    page_count = len(page_texts)
+    count_tokens = translator.get_token_counter(src, dest_langs[0])
+    page_segments = [segment_text(page_text, count_tokens) for page_text in page_texts]
+    print(f"Extracted {page_count} pages, {sum(len(segments) for segments in page_segments)} segments, "
+          f"translating into {len(dest_langs)} languages")
+
+    windows = [list(range(start, min(start + window, page_count))) for start in range(0, page_count, window)]
+    translated_pages = {dest: [None] * page_count for dest in dest_langs}
+    pages_done = {dest: 0 for dest in dest_langs}
+    outputs = {}
+    lock = threading.Lock()
+
+    # Interleave targets window by window when all their models fit in the registry at once
+    # (the shared source-to-English model counts once for pivoted targets); otherwise finish one
+    # target before starting the next so models are not reloaded per window
+    registry = getattr(translator, 'registry', None)
+    models_needed = len({hop for dest in dest_langs for hop in translator.plan_route(src, dest)})
+    if registry is None or registry.max_models is None or models_needed <= registry.max_models:
+        tasks = [(pages, list(dest_langs)) for pages in windows]
+    else:
+        tasks = [(pages, [dest]) for dest in dest_langs for pages in windows]
+
+    def finish(dest):
+        path = output_path_for(input_path, output_dir, dest)
+        if pdf_utils.write_pdf(translated_pages[dest], path):
+            outputs[dest] = path
+            print(f"Wrote {dest} translation to {path}")
+        translated_pages[dest] = None
+
+    def run(task):
+        pages, dests = task
+        texts = [segment.text for page in pages for segment in page_segments[page]]
+        per_dest = translator.translate_batch_multi(texts, src, dests, decoding=decoding)
+
+        for dest, translations in per_dest.items():
+            position = 0
+            for page in pages:
+                segments = page_segments[page]
+                translated_pages[dest][page] = join_segments(page_texts[page], segments, translations[position:position + len(segments)])
+                position += len(segments)
+
+            with lock:
+                pages_done[dest] += len(pages)
+                done = pages_done[dest]
+            if page_callback:
+                page_callback(dest, done, page_count)
+            if done == page_count:
+                finish(dest)
+
+    if page_count == 0:
+        for dest in dest_langs:
+            finish(dest)
+        return outputs
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in executor.map(run, tasks):
+            pass
+
+    return outputs
@@ -0,0 +1,128 @@
+import itertools
+import queue
+import threading
+import time
+
+# One background thread running the GUI's translation jobs in order. Tk widgets are only touched
+# on the Tk thread: jobs report through an event queue that the window drains with root.after.
+# Jobs are submitted to a slot ('text', 'pdf', ...); a new job replaces a queued job of the same
+# slot instead of piling up behind it, and asks a running job of that slot to stop.
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Job:
+    __slots__ = ('job_id', 'slot', 'func', 'cancel_event', 'started')
+
+    def __init__(self, job_id, slot, func):
+        self.job_id = job_id
+        self.slot = slot
+        self.func = func
+        self.cancel_event = threading.Event()
+        self.started = None
+
+
+class JobContext:
+    # Handed to job functions: emit events for the UI, report progress, check for cancellation
+    def __init__(self, worker, job):
+        self.worker = worker
+        self.job = job
+
+    @property
+    def cancel_event(self):
+        return self.job.cancel_event
+
+    def cancelled(self):
+        return self.job.cancel_event.is_set()
+
+    def check(self):
+        if self.job.cancel_event.is_set():
+            raise Cancelled()
+
+    def emit(self, kind, payload=None):
+        self.worker.events.put((self.job.slot, self.job.job_id, kind, payload))
+
+    def progress(self, done, total, message, skipped=0):
+        # skipped units (e.g. pages restored from a checkpoint) took no time and are left out of the ETA
+        elapsed = time.monotonic() - self.job.started
+        worked = done - skipped
+        eta = elapsed / worked * (total - done) if worked > 0 and total else None
+        self.emit('progress', {'done': done, 'total': total, 'message': message, 'eta': eta})
+
+
+class TranslationWorker:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = {}
+        self.current = None
+        self.events = queue.Queue()
+        self.ids = itertools.count(1)
+        self.thread = None
+
+    def submit(self, slot, func):
+        # func(context) runs on the worker thread; its return value is sent as a 'done' event.
+        # Returns the job id, which the UI uses to ignore events from superseded jobs.
+        job = Job(next(self.ids), slot, func)
+        with self.condition:
+            replaced = self.pending.pop(slot, None)
+            if replaced is not None:
+                self.events.put((slot, replaced.job_id, 'dropped', None))
+            if self.current is not None and self.current.slot == slot:
+                self.current.cancel_event.set()
+            self.pending[slot] = job
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="translation-worker", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+        return job.job_id
+
+    def cancel(self, slots=None):
+        # Stops the running job and drops queued ones, for the given slots or all of them
+        with self.condition:
+            for slot in list(self.pending):
+                if slots is None or slot in slots:
+                    job = self.pending.pop(slot)
+                    self.events.put((slot, job.job_id, 'dropped', None))
+            if self.current is not None and (slots is None or self.current.slot in slots):
+                self.current.cancel_event.set()
+
+    def busy(self, slot=None):
+        with self.condition:
+            if slot is None:
+                return self.current is not None or bool(self.pending)
+            return (self.current is not None and self.current.slot == slot) or slot in self.pending
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                # Oldest slot first
+                slot = next(iter(self.pending))
+                job = self.current = self.pending.pop(slot)
+            job.started = time.monotonic()
+            context = JobContext(self, job)
+            try:
+                result = job.func(context)
+                kind = 'cancelled' if job.cancel_event.is_set() else 'done'
+                self.events.put((job.slot, job.job_id, kind, result))
+            except Cancelled:
+                self.events.put((job.slot, job.job_id, 'cancelled', None))
+            except Exception as e:
+                print(f"{job.slot} job failed: {e}")
+                self.events.put((job.slot, job.job_id, 'error', e))
+            finally:
+                with self.condition:
+                    self.current = None
+
+    def drain(self, max_events=500):
+        # Events ready for the UI, without blocking
+        events = []
+        try:
+            while len(events) < max_events:
+                events.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        return events
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import extraction
+import pdf_utils
+from extraction import file_hash
+
+# Checkpointed long-document jobs. Translated pages are stored as each window finishes, keyed by
+# the document's content hash, the language pair, the model and the decoding profile, so a job
+# that crashed, was closed or was cancelled resumes from the first unfinished page.
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobStore:
+    def __init__(self, cache_dir=None, filename="jobs.sqlite", max_age_days=30):
+        # Defaults to the translator's model cache directory
+        cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".cache", "language_translator_models")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(cache_dir, filename), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, document_hash TEXT NOT NULL, source_path TEXT, src TEXT NOT NULL, "
+            "dest TEXT NOT NULL, model TEXT NOT NULL, page_count INTEGER NOT NULL, status TEXT NOT NULL, "
+            "created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "job_id TEXT NOT NULL, page_number INTEGER NOT NULL, translation TEXT NOT NULL, "
+            "PRIMARY KEY (job_id, page_number))"
+        )
+        self.db.commit()
+        self.prune(max_age_days)
+
+    def open_job(self, document_hash, source_path, src, dest, model, page_count):
+        # Returns the id of the job for this document and settings, creating it if needed
+        job_id = hashlib.sha256("\0".join((document_hash, src, dest, model)).encode('utf-8')).hexdigest()[:32]
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, 'running', ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET status = 'running', source_path = excluded.source_path, updated = excluded.updated",
+                (job_id, document_hash, source_path, src, dest, model, page_count, now, now),
+            )
+            self.db.commit()
+        return job_id
+
+    def completed_pages(self, job_id):
+        with self.lock:
+            rows = self.db.execute("SELECT page_number FROM pages WHERE job_id = ?", (job_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def save_pages(self, job_id, translations):
+        # translations: {page_number: translated text}; committed together as one checkpoint
+        with self.lock:
+            self.db.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)",
+                                [(job_id, page_number, text) for page_number, text in translations.items()])
+            self.db.execute("UPDATE jobs SET updated = ? WHERE job_id = ?", (time.time(), job_id))
+            self.db.commit()
+
+    def iter_pages(self, job_id):
+        # (page_number, translation) for the finished pages, in document order
+        with self.lock:
+            rows = self.db.execute("SELECT page_number, translation FROM pages WHERE job_id = ? ORDER BY page_number",
+                                   (job_id,)).fetchall()
+        for row in rows:
+            yield row[0], row[1]
+
+    def translated_pages(self, job_id):
+        return [translation for _, translation in self.iter_pages(job_id)]
+
+    def set_status(self, job_id, status):
+        with self.lock:
+            self.db.execute("UPDATE jobs SET status = ?, updated = ? WHERE job_id = ?", (status, time.time(), job_id))
+            self.db.commit()
+
+    def list_jobs(self):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT jobs.job_id, source_path, src, dest, status, page_count, COUNT(pages.page_number) "
+                "FROM jobs LEFT JOIN pages ON pages.job_id = jobs.job_id GROUP BY jobs.job_id ORDER BY updated DESC"
+            ).fetchall()
+        return [
+            {'job_id': row[0], 'source_path': row[1], 'src': row[2], 'dest': row[3], 'status': row[4],
+             'page_count': row[5], 'pages_done': row[6]}
+            for row in rows
+        ]
+
+    def delete_job(self, job_id):
+        with self.lock:
+            self.db.execute("DELETE FROM pages WHERE job_id = ?", (job_id,))
+            self.db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            self.db.commit()
+
+    def prune(self, max_age_days):
+        # Forget jobs that have not been touched for max_age_days
+        cutoff = time.time() - max_age_days * 24 * 3600
+        with self.lock:
+            old_jobs = [row[0] for row in self.db.execute("SELECT job_id FROM jobs WHERE updated < ?", (cutoff,))]
+            for job_id in old_jobs:
+                self.db.execute("DELETE FROM pages WHERE job_id = ?", (job_id,))
+                self.db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            self.db.commit()
+
+
+def run_pdf_job(store, input_path, src, dest, translator, window=4, decoding=None, cancel_event=None, page_callback=None):
+    # Translates input_path page by page, checkpointing each window, and returns the job id.
+    # Pages finished by an earlier run are skipped. Raises JobCancelled when cancel_event is set;
+    # the job can be resumed later by calling this again with the same arguments.
+    # page_callback(page_number, page_count, translated_text, resumed) is called for every page,
+    # first for the ones restored from a checkpoint (resumed=True), then as new windows finish.
+    decoding = decoding or translator.decoding_profile
+    model = f"{translator.get_model_name(src, dest)}:{translator.inference_profile}:{decoding}"
+    page_count = pdf_utils.count_pdf_pages(input_path)
+    document_hash = file_hash(input_path)
+    job_id = store.open_job(document_hash, os.path.abspath(input_path), src, dest, model, page_count)
+
+    done = store.completed_pages(job_id)
+    if done:
+        print(f"Resuming job {job_id}: {len(done)}/{page_count} pages already translated")
+    if page_callback:
+        for page_number, text in store.iter_pages(job_id):
+            page_callback(page_number + 1, page_count, text, True)
+
+    remaining = [page_number for page_number in range(page_count) if page_number not in done]
+    # Extracted pages are cached next to the job store
+    extraction_cache = extraction.get_cache(store.cache_dir)
+    try:
+        for start in range(0, len(remaining), window):
+            if cancel_event is not None and cancel_event.is_set():
+                raise JobCancelled(f"Job {job_id} cancelled after {page_count - len(remaining) + start}/{page_count} pages")
+
+            page_numbers = remaining[start:start + window]
+            # Extracted a window at a time in this process (or read from the extraction cache when
+            # the document was translated before), so the first pages show up without waiting for
+            # the rest; image-only pages come back empty and translate to empty pages
+            window_texts = [page.text for page in extraction.extract_pages(input_path, page_numbers, cache=extraction_cache,
+                                                                            document_hash=document_hash)]
+            translated = list(pdf_utils.translate_pdf_pages(window_texts, src, dest, window=len(page_numbers),
+                                                            text_translator=translator, decoding=decoding))
+            store.save_pages(job_id, dict(zip(page_numbers, translated)))
+
+            if page_callback:
+                for page_number, text in zip(page_numbers, translated):
+                    page_callback(page_number + 1, page_count, text, False)
+    except JobCancelled:
+        store.set_status(job_id, 'cancelled')
+        raise
+    except Exception:
+        store.set_status(job_id, 'failed')
+        raise
+
+    store.set_status(job_id, 'done')
+    return job_id
@@ -0,0 +1,152 @@
+try:
+    import fitz  # PyMuPDF
+    FITZ_AVAILABLE = True
+except ImportError:
+    FITZ_AVAILABLE = False
+
+from segmenter import segment_text, join_segments
+from translator import get_translator, LANGUAGE_CODE_MAP
+
+# Layout-preserving PDF output. Text blocks are read with their bounding boxes, translated in
+# batches, and written back into the original pages: the source text in each block is redacted
+# and the translation is fitted into the same box. Images and vector graphics are left in place,
+# so nothing is re-rendered.
+
+# Built-in PDF fonts that cover CJK scripts; everything else uses Helvetica unless a font file is given
+SCRIPT_FONTS = {'zh': 'china-s', 'ja': 'japan', 'ko': 'korea'}
+
+# Targets whose alphabet fits Helvetica's Latin-1 character set; other scripts (Cyrillic, Arabic,
+# Devanagari, Thai, and Latin alphabets such as Polish or Turkish) need a font file
+HELVETICA_LANGUAGES = {'en', 'fr', 'de', 'es', 'it', 'pt', 'nl', 'sv'}
+
+MIN_FONT_SIZE = 4
+
+
+class TextBlock:
+    __slots__ = ('rect', 'text', 'font_size', 'color')
+
+    def __init__(self, rect, text, font_size, color):
+        self.rect = rect
+        self.text = text
+        self.font_size = font_size
+        self.color = color
+
+
+def _span_color(color):
+    # PyMuPDF reports span colors as a packed sRGB integer
+    return ((color >> 16) & 255) / 255, ((color >> 8) & 255) / 255, (color & 255) / 255
+
+
+def extract_blocks(page):
+    # Text blocks of a page with their bounding box, dominant font size and color
+    blocks = []
+    for block in page.get_text("dict")["blocks"]:
+        if block.get("type") != 0:
+            continue
+        lines = []
+        sizes = {}
+        color = 0
+        for line in block["lines"]:
+            line_text = "".join(span["text"] for span in line["spans"])
+            if line_text.strip():
+                lines.append(line_text)
+            for span in line["spans"]:
+                if span["text"].strip():
+                    sizes[span["size"]] = sizes.get(span["size"], 0) + len(span["text"])
+                    color = span.get("color", color)
+        if not lines:
+            continue
+        font_size = max(sizes, key=sizes.get) if sizes else 11
+        blocks.append(TextBlock(fitz.Rect(block["bbox"]), "\n".join(lines), font_size, _span_color(color)))
+    return blocks
+
+
+def _language_code(language):
+    return {name: code for code, name in LANGUAGE_CODE_MAP.items()}.get(language, language)
+
+
+def needs_fontfile(dest):
+    # True when no built-in PDF font covers the target language's script
+    dest_code = _language_code(dest)
+    return dest_code not in SCRIPT_FONTS and dest_code not in HELVETICA_LANGUAGES
+
+
+def fit_text(page, rect, text, font_size, color, fontname, fontfile):
+    # Insert text into rect at the largest size (up to the original) that fits
+    size = font_size
+    while size >= MIN_FONT_SIZE:
+        if page.insert_textbox(rect, text, fontsize=size, fontname=fontname, fontfile=fontfile, color=color) >= 0:
+            return size
+        size *= 0.9
+    # Still too long: let the box grow downwards rather than drop text
+    taller = fitz.Rect(rect.x0, rect.y0, rect.x1, page.rect.y1)
+    page.insert_textbox(taller, text, fontsize=MIN_FONT_SIZE, fontname=fontname, fontfile=fontfile, color=color)
+    return MIN_FONT_SIZE
+
+
+def _translate_blocks(page_blocks, src, dest, translator, count_tokens, decoding):
+    # Segments every block of the window and translates them in one batched call
+    block_segments = [[segment_text(block.text, count_tokens) for block in blocks] for blocks in page_blocks]
+    texts = [segment.text for blocks in block_segments for segments in blocks for segment in segments]
+    translated = translator.translate_batch(texts, src, dest, decoding=decoding)
+
+    results = []
+    position = 0
+    for blocks, segments_per_block in zip(page_blocks, block_segments):
+        page_results = []
+        for block, segments in zip(blocks, segments_per_block):
+            block_translation = join_segments(block.text, segments, translated[position:position + len(segments)])
+            position += len(segments)
+            # Line breaks inside a block came from the source layout; the text box re-wraps
+            page_results.append(" ".join(block_translation.split()))
+        results.append(page_results)
+    return results
+
+
+def translate_pdf_layout(input_path, output_path, src, dest, window=4, text_translator=None,
+                         decoding=None, fontfile=None, page_callback=None, cancel_event=None):
+    # Writes a copy of input_path with every text block replaced by its translation.
+    # fontfile is a TTF/OTF covering the target script (needed for e.g. Arabic, Hindi, Thai, Cyrillic).
+    # Setting cancel_event stops the job between windows without writing the output (returns False).
+    if not FITZ_AVAILABLE:
+        print("Layout-preserving output not available - PyMuPDF not installed")
+        return False
+
+    translator = text_translator or get_translator()
+    count_tokens = translator.get_token_counter(src, dest)
+    fontname = "F0" if fontfile else SCRIPT_FONTS.get(_language_code(dest), "helv")
+
+    try:
+        doc = fitz.open(input_path)
+        for start in range(0, doc.page_count, window):
+            if cancel_event is not None and cancel_event.is_set():
+                print("Layout-preserving translation cancelled")
+                doc.close()
+                return False
+            pages = [doc[number] for number in range(start, min(start + window, doc.page_count))]
+            page_blocks = [extract_blocks(page) for page in pages]
+            page_translations = _translate_blocks(page_blocks, src, dest, translator, count_tokens, decoding)
+
+            for page, blocks, translations in zip(pages, page_blocks, page_translations):
+                if not blocks:
+                    continue
+                # Remove only the source text; images and line art under the blocks stay untouched
+                for block in blocks:
+                    page.add_redact_annot(block.rect, fill=False, cross_out=False)
+                page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE,
+                                      graphics=fitz.PDF_REDACT_LINE_ART_NONE,
+                                      text=fitz.PDF_REDACT_TEXT_REMOVE)
+
+                for block, translation in zip(blocks, translations):
+                    if translation:
+                        fit_text(page, block.rect, translation, block.font_size, block.color, fontname, fontfile)
+
+                if page_callback:
+                    page_callback(page.number + 1, doc.page_count)
+
+        doc.save(output_path, garbage=3, deflate=True)
+        doc.close()
+        return True
+    except Exception as e:
+        print(f"Error writing layout-preserving PDF: {str(e)}")
+        return False
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+
+from segmenter import split_sentences
+from translation_memory import normalize_segment
+
+# Live translation of the text box. The input is split into sentences and each sentence's
+# translation is cached, so after an edit only the changed sentences go to the model, and the
+# output box is patched where the output changed instead of being rewritten.
+
+
+class LiveTranslation:
+    def __init__(self, translator, max_entries=5000):
+        self.translator = translator
+        self.max_entries = max_entries
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def translate(self, text, src_lang, dest_lang, decoding='fast', check_cancelled=None):
+        # Returns (pieces, translated): the output as a list alternating the source's whitespace
+        # and sentence translations, and how many sentences had to be sent to the model.
+        # check_cancelled is called before the model runs and may raise to abandon the update.
+        segments = split_sentences(text)
+        keys = [(src_lang, dest_lang, decoding, normalize_segment(segment.text)) for segment in segments]
+
+        with self.lock:
+            missing = list(OrderedDict.fromkeys(key for key in keys if key not in self.cache))
+        if missing:
+            if check_cancelled:
+                check_cancelled()
+            translations = self.translator.translate_batch([key[3] for key in missing], src_lang, dest_lang, decoding=decoding)
+            with self.lock:
+                for key, translation in zip(missing, translations):
+                    self.cache[key] = translation
+                    self.cache.move_to_end(key)
+
+        pieces = []
+        position = 0
+        with self.lock:
+            for segment, key in zip(segments, keys):
+                translation = self.cache.get(key, "")
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                pieces.append(text[position:segment.start])
+                pieces.append(translation)
+                position = segment.end
+            pieces.append(text[position:])
+
+            # Failed translations are shown once but not kept, so the next edit retries them
+            for key in missing:
+                if self.cache.get(key, "").startswith("Translation error"):
+                    del self.cache[key]
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+        return pieces, len(missing)
+
+
+def diff_pieces(old_pieces, new_pieces):
+    # The smallest single replacement turning the old output into the new one:
+    # (start, end, text) in characters of the old output
+    limit = min(len(old_pieces), len(new_pieces))
+    prefix = 0
+    while prefix < limit and old_pieces[prefix] == new_pieces[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old_pieces[-1 - suffix] == new_pieces[-1 - suffix]:
+        suffix += 1
+
+    start = sum(len(piece) for piece in old_pieces[:prefix])
+    end = start + sum(len(piece) for piece in old_pieces[prefix:len(old_pieces) - suffix])
+    return start, end, "".join(new_pieces[prefix:len(new_pieces) - suffix])
@@ -1,43 +1,26 @@
 from tkinter import *
 from tkinter import filedialog, messagebox, ttk
 import os
-import sys
-
-# Add error handling for imports
-try:
-    import torch
-    print("PyTorch successfully imported, version:", torch.__version__)
-except ImportError as e:
-    print(f"Error importing torch: {e}")
-    messagebox.showerror("Import Error", f"Failed to import torch: {e}\nPlease install it using: pip install torch")
-    sys.exit(1)
-
-try:
-    import fitz  # PyMuPDF
-    print("PyMuPDF successfully imported")
-except ImportError as e:
-    print(f"Error importing fitz (PyMuPDF): {e}")
-    messagebox.showerror("Import Error", f"Failed to import PyMuPDF: {e}\nPlease install it using: pip install PyMuPDF")
-    sys.exit(1)
-
-try:
-    from fpdf import FPDF
-    print("FPDF successfully imported")
-except ImportError as e:
-    print(f"Error importing FPDF: {e}")
-    messagebox.showerror("Import Error", f"Failed to import FPDF: {e}\nPlease install it using: pip install fpdf")
-    sys.exit(1)
-
-try:
-    from translator import TextTranslator
-    print("TextTranslator successfully imported")
-except ImportError as e:
-    print(f"Error importing TextTranslator: {e}")
-    messagebox.showerror("Import Error", f"Failed to import the translator module: {e}\nCheck if translator.py exists and all its dependencies are installed.")
-    sys.exit(1)
-
+import queue
+import time
 from threading import Thread
 
+from gui_worker import TranslationWorker, Cancelled
+
+started = time.perf_counter()
+
+# torch, transformers and PyMuPDF take seconds to import, so they are loaded on a background
+# thread after the window is shown (see start_translator). Until then translator is None.
+translator = None
+job_store = None
+pdf_utils = None
+layout = None
+jobs = None
+
+# Language pairs loaded right after startup, e.g. TRANSLATOR_PREWARM="hindi,french,german:english".
+# A bare language means translating from English.
+DEFAULT_PREWARM = "hindi"
+
 # Language list for the dropdown menu
 LANGUAGES = {
     'en': 'english', 'fr': 'french', 'de': 'german', 'es': 'spanish',
@@ -52,11 +35,74 @@ root.title("DEEP LEARNING LANGUAGE TRANSLATOR")
 root.geometry("1000x650")
 root.configure(bg="#f2f2f2")
 
-# Initialize our deep learning translator
-print("Initializing translator...")
-translator = TextTranslator()
 language_list = list(LANGUAGES.values())
 
+# Readiness of each language pair: 'queued', 'loading', 'ready' or 'failed'. Written by the
+# loader thread and shown by refresh_readiness on the Tk thread.
+pair_states = {}
+prewarm_queue = queue.Queue()
+startup_error = []
+
+def start_translator():
+    global translator, job_store, pdf_utils, layout, jobs
+    try:
+        print("Initializing translator...")
+        from translator import get_translator, parse_language_pairs
+        import pdf_utils
+        import layout
+        import jobs
+        new_translator = get_translator()
+        # Checkpoints of PDF jobs, stored next to the model cache
+        job_store = jobs.JobStore(getattr(new_translator, 'model_cache_dir', None))
+    except Exception as e:
+        # Any failure (missing packages, a damaged model store, an unwritable cache directory)
+        # leaves translator None, so the translate actions stay disabled
+        print(f"Error starting the translator: {e}")
+        startup_error.append(e)
+        return
+    # Published last: the Tk thread treats a non-None translator as ready to use
+    translator = new_translator
+    
+    for pair in parse_language_pairs(os.environ.get('TRANSLATOR_PREWARM', DEFAULT_PREWARM)):
+        request_pair(pair)
+    
+    # Load requested pairs one at a time, in the order they were asked for
+    while True:
+        pair = prewarm_queue.get()
+        if pair_states.get(pair) == 'ready':
+            continue
+        pair_states[pair] = 'loading'
+        try:
+            translator.prewarm(*pair)
+            pair_states[pair] = 'ready'
+        except Exception as e:
+            print(f"Could not prepare {pair[0]} to {pair[1]}: {e}")
+            pair_states[pair] = 'failed'
+
+def request_pair(pair):
+    if pair not in pair_states or pair_states[pair] == 'failed':
+        pair_states[pair] = 'queued'
+        prewarm_queue.put(pair)
+
+def translator_ready():
+    if startup_error:
+        messagebox.showerror("Error", f"The translator failed to start: {startup_error[0]}")
+        return False
+    if translator is None:
+        messagebox.showinfo("Please wait", "The translator is still starting up, try again in a moment.")
+        return False
+    return True
+
+def ready_status():
+    if translator is None:
+        return "Starting translator..."
+    if getattr(translator, 'fallback_mode', False):
+        return "FALLBACK MODE - Deep Learning Models not loaded"
+    if translator.device.type == 'cuda':
+        import torch
+        return "Ready - Deep Learning Models using GPU: " + torch.cuda.get_device_name(0)
+    return "Ready - Deep Learning Models using CPU"
+
 # Add a check button to verify transformers installation
 def check_transformers_installation():
     try:
@@ -65,25 +111,52 @@ def check_transformers_installation():
     except ImportError:
         messagebox.showerror("Transformers Status", "Transformers is NOT installed. Translation will run in fallback mode.")
         
+# All translation work runs on one background worker; see poll_events for how results come back
+worker = TranslationWorker()
+# Job id currently shown for each slot, and the completion handlers of each job
+active_jobs = {}
+job_handlers = {}
+
+# Live mode: sentence translations cached across edits, and the output pieces currently shown
+# in output_box (None when the box holds something else, e.g. a full translation)
+live_translation = None
+live_pieces = None
+live_after_id = None
+LIVE_DEBOUNCE_MS = 400
+
+# Segments translated per step when streaming text into the output box
+TEXT_CHUNK = 8
+
+def start_job(slot, func, message, on_done=None, on_error=None):
+    # Queue func on the worker; a queued job of the same slot is replaced, a running one cancelled
+    job_id = worker.submit(slot, func)
+    active_jobs[slot] = job_id
+    job_handlers[job_id] = (on_done, on_error)
+    status_var.set(message)
+    progress_var.set(0)
+    return job_id
+
+def cancel_jobs(slots=None):
+    if worker.busy():
+        worker.cancel(slots)
+        status_var.set("Cancelling...")
+
 # Add a test translation function for debugging
 def test_translation():
+    if not translator_ready():
+        return
     test_text = "Hello, this is a test."
-    try:
-        status_var.set("Running test translation...")
-        root.update()
-        
-        result = translator.translate_text(test_text, 'english', 'french')
-        
+    
+    def show_result(result):
         messagebox.showinfo("Test Translation", 
                            f"Test translation result:\n\nEnglish: {test_text}\n\nFrench: {result}")
-        
-        if torch.cuda.is_available():
-            status_var.set("Ready - Deep Learning Models using GPU: " + torch.cuda.get_device_name(0))
-        else:
-            status_var.set("Ready - Deep Learning Models using CPU")
-    except Exception as e:
-        messagebox.showerror("Test Translation Failed", f"Error: {str(e)}")
+    
+    def show_error(error):
+        messagebox.showerror("Test Translation Failed", f"Error: {str(error)}")
         status_var.set("Test translation failed - check console")
+    
+    start_job('test', lambda context: translator.translate_text(test_text, 'english', 'french'),
+              "Running test translation...", show_result, show_error)
 
 def get_lang_code(lang_name):
     for code, name in LANGUAGES.items():
@@ -92,44 +165,92 @@ def get_lang_code(lang_name):
     return "en"
 
 def translate_text():
+    if not translator_ready():
+        return
     input_text = input_box.get("1.0", END).strip()
     src_lang = 'english'  # Fixed input language
     dest_lang = output_lang_var.get()
     
     if input_text:
-        # Show loading indicator
-        output_box.delete("1.0", END)
-        output_box.insert(END, "Translating... Please wait.")
-        root.update()
+        def perform_translation(context):
+            from segmenter import segment_text
+            
+            # Segments are translated a few at a time and streamed into the output box;
+            # greedy decoding keeps interactive translation fast
+            segments = segment_text(input_text, translator.get_token_counter(src_lang, dest_lang))
+            position = 0
+            for start in range(0, len(segments), TEXT_CHUNK):
+                context.check()
+                chunk = segments[start:start + TEXT_CHUNK]
+                translations = translator.translate_batch([segment.text for segment in chunk], src_lang, dest_lang, decoding='fast')
+                pieces = []
+                for segment, translation in zip(chunk, translations):
+                    pieces.append(input_text[position:segment.start])
+                    pieces.append(translation)
+                    position = segment.end
+                context.emit('output', "".join(pieces))
+                context.progress(start + len(chunk), len(segments), "Translating text")
+            context.emit('output', input_text[position:])
         
-        def perform_translation():
-            try:
-                print(f"Starting translation from {src_lang} to {dest_lang}")
-                status_var.set(f"Translating from {src_lang} to {dest_lang}...")
-                root.update()
-                
-                translated = translator.translate_text(input_text, src_lang, dest_lang)
-                
-                output_box.delete("1.0", END)
-                output_box.insert(END, translated)
-                
-                # Reset status
-                if torch.cuda.is_available():
-                    status_var.set("Ready - Deep Learning Models using GPU: " + torch.cuda.get_device_name(0))
-                else:
-                    status_var.set("Ready - Deep Learning Models using CPU")
-                    
-            except Exception as e:
-                error_message = str(e)
-                print(f"Translation error: {error_message}")
-                output_box.delete("1.0", END)
-                output_box.insert(END, f"Translation failed: {error_message}\nCheck your input or internet connection.")
-                
-                # Reset status
-                status_var.set("Error occurred - Check console for details")
+        def show_error(error):
+            output_box.delete("1.0", END)
+            output_box.insert(END, f"Translation failed: {error}\nCheck your input or internet connection.")
+            status_var.set("Error occurred - Check console for details")
         
-        # Run translation in a separate thread to keep UI responsive
-        Thread(target=perform_translation).start()
+        global live_pieces
+        live_pieces = None
+        output_box.delete("1.0", END)
+        start_job('text', perform_translation, f"Translating from {src_lang} to {dest_lang}...", on_error=show_error)
+
+def schedule_live_translation(event=None):
+    # Debounced: each keystroke pushes the update back, so typing does not queue model work
+    global live_after_id
+    if not live_var.get():
+        return
+    if live_after_id is not None:
+        root.after_cancel(live_after_id)
+    live_after_id = root.after(LIVE_DEBOUNCE_MS, run_live_translation)
+
+def run_live_translation():
+    global live_after_id, live_translation
+    live_after_id = None
+    if translator is None or not live_var.get():
+        return
+    if live_translation is None:
+        from live import LiveTranslation
+        live_translation = LiveTranslation(translator)
+    input_text = input_box.get("1.0", "end-1c")
+    dest_lang = output_lang_var.get()
+    
+    def update(context):
+        return live_translation.translate(input_text, 'english', dest_lang, check_cancelled=context.check)
+    
+    def patch_output(result):
+        # Replace only the part of the output that changed
+        global live_pieces
+        pieces, translated = result
+        if live_pieces is None:
+            output_box.delete("1.0", END)
+            output_box.insert("1.0", "".join(pieces))
+        else:
+            from live import diff_pieces
+            start, end, replacement = diff_pieces(live_pieces, pieces)
+            if end > start:
+                output_box.delete(f"1.0 + {start} chars", f"1.0 + {end} chars")
+            if replacement:
+                output_box.insert(f"1.0 + {start} chars", replacement)
+        live_pieces = pieces
+        status_var.set(f"Live translation updated ({translated} new sentence{'' if translated == 1 else 's'} translated)")
+    
+    # A full translation still running would overwrite the live output
+    worker.cancel(('text',))
+    start_job('live', update, "Updating live translation...", patch_output)
+
+def toggle_live_translation():
+    global live_pieces
+    live_pieces = None
+    if live_var.get():
+        schedule_live_translation()
 
 def select_pdf():
     file_path = filedialog.askopenfilename(filetypes=[("PDF Files", "*.pdf")])
@@ -137,109 +258,187 @@ def select_pdf():
         pdf_path_var.set(file_path)
 
 def translate_pdf():
+    if not translator_ready():
+        return
     file_path = pdf_path_var.get()
     dest_lang = pdf_lang_var.get()
     if not file_path or not dest_lang:
         messagebox.showerror("Error", "Please select PDF and output language.")
         return
     
-    # Show loading indicator
-    pdf_output_box.delete("1.0", END)
-    pdf_output_box.insert(END, "Translating PDF... This may take a while for large documents.")
-    root.update()
-    
-    def perform_pdf_translation():
-        try:
-            print(f"Opening PDF file: {file_path}")
-            status_var.set("Reading PDF...")
-            root.update()
-            
-            doc = fitz.open(file_path)
-            full_text = ""
-            for page in doc:
-                full_text += page.get_text()
-            
-            print(f"PDF extracted, text length: {len(full_text)}")
-            
-            # Translate in chunks to avoid exceeding model capacity
-            max_chunk_size = 500  # Characters
-            chunks = [full_text[i:i+max_chunk_size] for i in range(0, len(full_text), max_chunk_size)]
-            
-            print(f"Split into {len(chunks)} chunks for translation")
-            
-            translated_chunks = []
-            for i, chunk in enumerate(chunks):
-                # Update progress
-                status_message = f"Translating chunk {i+1}/{len(chunks)}..."
-                pdf_output_box.delete("1.0", END)
-                pdf_output_box.insert(END, f"Translating chunk {i+1}/{len(chunks)}... Please wait.")
-                status_var.set(status_message)
-                root.update()
-                
-                print(f"Translating chunk {i+1}/{len(chunks)}")
-                translated = translator.translate_text(chunk, 'english', dest_lang)
-                translated_chunks.append(translated)
-            
-            complete_translation = ' '.join(translated_chunks)
-            pdf_output_box.delete("1.0", END)
-            pdf_output_box.insert(END, complete_translation)
-            
-            # Reset status
-            if torch.cuda.is_available():
-                status_var.set("Ready - Deep Learning Models using GPU: " + torch.cuda.get_device_name(0))
+    def perform_pdf_translation(context):
+        print(f"Opening PDF file: {file_path}")
+        restored = [0]
+        
+        def show_page(page_number, page_count, translated_page, resumed):
+            context.emit('output', translated_page)
+            if resumed:
+                restored[0] += 1
+                context.progress(page_number, page_count, "Restored pages from an earlier run", restored[0])
             else:
-                status_var.set("Ready - Deep Learning Models using CPU")
-                
-        except Exception as e:
-            error_message = str(e)
-            print(f"PDF Translation error: {error_message}")
-            pdf_output_box.delete("1.0", END)
-            pdf_output_box.insert(END, f"PDF Translation failed: {error_message}")
-            
-            # Reset status
-            status_var.set("Error occurred - Check console for details")
+                context.progress(page_number, page_count, "Translated page", restored[0])
+        
+        # Pages are translated a window at a time and checkpointed, so a job that was
+        # cancelled or interrupted picks up from its first unfinished page
+        try:
+            job_id = jobs.run_pdf_job(job_store, file_path, 'english', dest_lang, translator, decoding='balanced',
+                                      cancel_event=context.cancel_event, page_callback=show_page)
+        except jobs.JobCancelled:
+            raise Cancelled()
+        # Keep the saved result in document order
+        return job_store.translated_pages(job_id)
+    
+    def finish(pages):
+        translated_pages[:] = pages
+    
+    def show_error(error):
+        pdf_output_box.delete("1.0", END)
+        pdf_output_box.insert(END, f"PDF Translation failed: {error}")
+        status_var.set("Error occurred - Check console for details")
     
-    # Run PDF translation in a separate thread to keep UI responsive
-    Thread(target=perform_pdf_translation).start()
+    translated_pages.clear()
+    pdf_output_box.delete("1.0", END)
+    start_job('pdf', perform_pdf_translation, "Reading PDF...", finish, show_error)
+
+def cancel_pdf():
+    # The running job stops after its current window; finished pages stay checkpointed
+    cancel_jobs(('pdf', 'layout', 'save'))
+
+# Translated page texts of the last PDF job, used when saving the result
+translated_pages = []
+# Font file chosen for each target language of "Download with Original Layout"
+layout_fonts = {}
 
 def download_translated_pdf():
+    if not translator_ready():
+        return
     translated_text = pdf_output_box.get("1.0", END).strip()
     if not translated_text:
         messagebox.showerror("Error", "No translated text to save.")
         return
     file_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
     if file_path:
-        try:
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_auto_page_break(auto=True, margin=15)
-            pdf.set_font("Arial", size=12)
-            
-            # Split text into manageable chunks to avoid FPDF line length limits
-            lines = []
-            for paragraph in translated_text.split('\n'):
-                # Split long paragraphs
-                if len(paragraph) > 80:
-                    words = paragraph.split()
-                    line = ""
-                    for word in words:
-                        if len(line + " " + word) <= 80:
-                            line += " " + word if line else word
-                        else:
-                            lines.append(line)
-                            line = word
-                    if line:
-                        lines.append(line)
-                else:
-                    lines.append(paragraph)
-            
-            for line in lines:
-                pdf.multi_cell(0, 10, line)
-            
-            pdf.output(file_path)
-            messagebox.showinfo("Success", "PDF saved successfully.")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save PDF: {str(e)}")
+        # Write the translated pages as they were produced, or the edited text if it was changed
+        if translated_pages and translated_text == "".join(translated_pages).strip():
+            output_pages = list(translated_pages)
+        else:
+            output_pages = [translated_text]
+        
+        def write(context):
+            if not pdf_utils.write_pdf(output_pages, file_path):
+                raise RuntimeError("could not write the PDF file, see console for details")
+        
+        start_job('save', write, "Saving PDF...",
+                  lambda result: messagebox.showinfo("Success", "PDF saved successfully."),
+                  lambda error: messagebox.showerror("Error", f"Failed to save PDF: {str(error)}"))
+
+def download_layout_pdf():
+    if not translator_ready():
+        return
+    source_path = pdf_path_var.get()
+    dest_lang = pdf_lang_var.get()
+    if not source_path or not dest_lang:
+        messagebox.showerror("Error", "Please select PDF and output language.")
+        return
+    fontfile = None
+    if layout.needs_fontfile(dest_lang):
+        # The built-in PDF fonts would drop this script's letters; ask once per language for a font
+        fontfile = layout_fonts.get(dest_lang) or filedialog.askopenfilename(
+            title=f"Choose a font covering {dest_lang.title()}", filetypes=[("Font files", "*.ttf *.otf"), ("All files", "*.*")])
+        if not fontfile:
+            messagebox.showerror("Error", f"Writing {dest_lang.title()} into the original layout needs a TTF/OTF font "
+                                          "covering its script. Use \"Download Translated PDF\" for plain text output.")
+            return
+        layout_fonts[dest_lang] = fontfile
+    file_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
+    if not file_path:
+        return
+    
+    def perform_layout_translation(context):
+        def report_page(page_number, page_count):
+            context.progress(page_number, page_count, "Writing translated pages into the original layout")
+        
+        # Translates each text block in place, keeping images and graphics of the original pages
+        if not layout.translate_pdf_layout(source_path, file_path, 'english', dest_lang, text_translator=translator,
+                                           decoding='balanced', fontfile=fontfile, page_callback=report_page,
+                                           cancel_event=context.cancel_event):
+            context.check()
+            raise RuntimeError("Failed to save PDF, see console for details.")
+    
+    def show_error(error):
+        status_var.set("Error occurred - Check console for details")
+        messagebox.showerror("Error", str(error))
+    
+    start_job('layout', perform_layout_translation, "Translating PDF with original layout...",
+              lambda result: messagebox.showinfo("Success", "PDF saved successfully."), show_error)
+
+def format_eta(seconds):
+    if seconds is None:
+        return ""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f", about {seconds // 3600}h {seconds % 3600 // 60}m left"
+    if seconds >= 60:
+        return f", about {seconds // 60}m {seconds % 60}s left"
+    return f", about {seconds}s left"
+
+def poll_events():
+    # Runs on the Tk thread every POLL_MS: applies what the worker reported since the last poll.
+    # Output for a box is gathered into a single insert so long jobs do not flood the widget.
+    output_boxes = {'text': output_box, 'pdf': pdf_output_box}
+    pending_output = {}
+    
+    def flush(slot):
+        pieces = pending_output.pop(slot, None)
+        if pieces:
+            output_boxes[slot].insert(END, "".join(pieces))
+            if slot == 'pdf':
+                output_boxes[slot].see(END)
+    
+    for slot, job_id, kind, payload in worker.drain():
+        if kind in ('done', 'error', 'cancelled', 'dropped'):
+            on_done, on_error = job_handlers.pop(job_id, (None, None))
+        if active_jobs.get(slot) != job_id:
+            # Events of a job that was replaced by a newer one
+            continue
+        
+        if kind == 'output':
+            pending_output.setdefault(slot, []).append(payload)
+            if slot == 'pdf':
+                translated_pages.append(payload)
+            continue
+        flush(slot)
+        
+        if kind == 'progress':
+            if payload['total']:
+                progress_var.set(100.0 * payload['done'] / payload['total'])
+            status_var.set(f"{payload['message']} {payload['done']}/{payload['total']}{format_eta(payload['eta'])}")
+        elif kind == 'done':
+            del active_jobs[slot]
+            progress_var.set(100)
+            status_var.set(ready_status())
+            if on_done:
+                on_done(payload)
+        elif kind == 'error':
+            del active_jobs[slot]
+            progress_var.set(0)
+            status_var.set("Error occurred - Check console for details")
+            if on_error:
+                on_error(payload)
+        elif kind in ('cancelled', 'dropped'):
+            # 'dropped': the job was cancelled while still queued, before it started
+            del active_jobs[slot]
+            progress_var.set(0)
+            if slot == 'pdf' and kind == 'cancelled':
+                status_var.set(f"Cancelled after {len(translated_pages)} pages - translate again to resume")
+            else:
+                status_var.set("Cancelled")
+    
+    for slot in list(pending_output):
+        flush(slot)
+    root.after(POLL_MS, poll_events)
+
+POLL_MS = 50
 
 def show_model_info():
     # Create a popup window to display model information
@@ -249,7 +448,19 @@ def show_model_info():
     info_window.configure(bg="#f2f2f2")
     
     # Device info
-    device_info = "Using GPU" if torch.cuda.is_available() else "Using CPU (GPU not available)"
+    if translator is None:
+        device_info = "Not known yet, the translator is still starting"
+    elif getattr(translator, 'device', None) is not None and translator.device.type == 'cuda':
+        device_info = "Using GPU"
+    else:
+        device_info = "Using CPU (GPU not available)"
+    
+    # Models currently held in memory
+    loaded_models = translator.model_memory_report() if translator is not None else []
+    if loaded_models:
+        loaded_info = "\n".join(f"    - {entry['key']}: {entry['size_mb']} MB, idle {entry['idle_seconds']:.0f}s" for entry in loaded_models)
+    else:
+        loaded_info = "    - none"
     
     # Model info text
     info_text = f"""
@@ -268,6 +479,9 @@ def show_model_info():
     
     Hardware Acceleration: {device_info}
     
+    Loaded Models:
+{loaded_info}
+    
     Note: The first translation for each language pair might take 
     longer as the model is downloaded and loaded.
     """
@@ -333,7 +547,11 @@ translate_btn_frame = Frame(main_frame, bg="#f2f2f2")
 translate_btn_frame.pack(pady=10)
 translate_btn = Button(translate_btn_frame, text="Translate Text", font=("Arial", 11, "bold"), 
                        bg="#3498db", fg="white", padx=15, pady=5, command=translate_text)
-translate_btn.pack()
+translate_btn.pack(side=LEFT)
+live_var = BooleanVar(value=False)
+Checkbutton(translate_btn_frame, text="Live", variable=live_var, command=toggle_live_translation,
+            bg="#f2f2f2", font=("Arial", 10)).pack(side=LEFT, padx=10)
+input_box.bind("<KeyRelease>", schedule_live_translation)
 
 # Create a separator
 separator = Frame(root, height=2, bg="#cccccc")
@@ -356,8 +574,10 @@ Button(pdf_file_frame, text="Browse", command=select_pdf, bg="#7f8c8d", fg="whit
 pdf_lang_frame = Frame(pdf_frame, bg="#f2f2f2")
 pdf_lang_frame.pack(fill=X, pady=5)
 Label(pdf_lang_frame, text="Output Language:", bg="#f2f2f2", font=("Arial", 10)).pack(side=LEFT, padx=5)
-ttk.Combobox(pdf_lang_frame, textvariable=pdf_lang_var, values=language_list, width=20, state='readonly').pack(side=LEFT, padx=5)
+pdf_lang_combo = ttk.Combobox(pdf_lang_frame, textvariable=pdf_lang_var, values=language_list, width=20, state='readonly')
+pdf_lang_combo.pack(side=LEFT, padx=5)
 Button(pdf_lang_frame, text="Translate PDF", command=translate_pdf, bg="#3498db", fg="white").pack(side=LEFT, padx=10)
+Button(pdf_lang_frame, text="Cancel", command=cancel_pdf, bg="#e74c3c", fg="white").pack(side=LEFT, padx=5)
 
 pdf_output_frame = Frame(pdf_frame, bg="#f2f2f2")
 pdf_output_frame.pack(fill=X, pady=5)
@@ -368,7 +588,9 @@ pdf_output_box.pack(padx=5, pady=5, fill=X)
 pdf_download_frame = Frame(pdf_frame, bg="#f2f2f2")
 pdf_download_frame.pack(fill=X, pady=10)
 Button(pdf_download_frame, text="Download Translated PDF", command=download_translated_pdf, 
-       bg="#2ecc71", fg="white", font=("Arial", 10, "bold")).pack()
+       bg="#2ecc71", fg="white", font=("Arial", 10, "bold")).pack(side=LEFT, padx=10, expand=True)
+Button(pdf_download_frame, text="Download with Original Layout", command=download_layout_pdf, 
+       bg="#27ae60", fg="white", font=("Arial", 10, "bold")).pack(side=LEFT, padx=10, expand=True)
 
 # Status bar at the bottom
 status_frame = Frame(root, bg="#2c3e50", height=25)
@@ -376,21 +598,58 @@ status_frame.pack(side=BOTTOM, fill=X)
 status_var = StringVar(value="Ready - Deep Learning Models")
 status_label = Label(status_frame, textvariable=status_var, bg="#2c3e50", fg="white", font=("Arial", 9))
 status_label.pack(side=LEFT, padx=10, pady=2)
-
-# Check if GPU is available and update status
-try:
-    if torch.cuda.is_available():
-        status_var.set("Ready - Deep Learning Models using GPU: " + torch.cuda.get_device_name(0))
-    else:
-        status_var.set("Ready - Deep Learning Models using CPU")
-except:
-    status_var.set("FALLBACK MODE - Deep Learning Models not loaded")
-    
-# Show a popup about the fallback mode
-if hasattr(translator, 'fallback_mode') and translator.fallback_mode:
-    messagebox.showinfo("Fallback Mode", 
-                       "The application is running in fallback mode because some dependencies are missing.\n\n"
-                       "For full functionality, please install all required packages:\n\n"
-                       "pip install torch transformers sentencepiece PyMuPDF fpdf tqdm sacremoses protobuf datasets")
+Button(status_frame, text="Cancel", command=cancel_jobs, bg="#34495e", fg="white", font=("Arial", 8)).pack(side=RIGHT, padx=5, pady=2)
+progress_var = DoubleVar(value=0)
+ttk.Progressbar(status_frame, variable=progress_var, maximum=100, length=160).pack(side=RIGHT, padx=5, pady=2)
+
+# Per-pair readiness, next to the status text
+readiness_var = StringVar(value="")
+Label(status_frame, textvariable=readiness_var, bg="#2c3e50", fg="#bdc3c7", font=("Arial", 9)).pack(side=RIGHT, padx=10, pady=2)
+status_var.set(ready_status())
+
+STATE_MARKS = {'queued': 'queued', 'loading': 'loading...', 'ready': 'ready', 'failed': 'failed'}
+
+def refresh_readiness():
+    # Polled on the Tk thread; the loader thread only writes plain Python state
+    if startup_error and status_var.get() == "Starting translator...":
+        error = startup_error[0]
+        status_var.set(f"Translator failed to start: {error}")
+        if isinstance(error, ImportError):
+            messagebox.showerror("Import Error", f"Failed to import the translator: {error}\n"
+                                 "Please install the dependencies: pip install torch transformers sentencepiece PyMuPDF")
+        else:
+            messagebox.showerror("Error", f"The translator failed to start: {error}")
+    elif translator is not None and status_var.get() == "Starting translator...":
+        status_var.set(ready_status())
+        # Show a popup about the fallback mode
+        if getattr(translator, 'fallback_mode', False):
+            messagebox.showinfo("Fallback Mode", 
+                               "The application is running in fallback mode because some dependencies are missing.\n\n"
+                               "For full functionality, please install all required packages:\n\n"
+                               "pip install torch transformers sentencepiece PyMuPDF fpdf tqdm sacremoses protobuf datasets")
+    readiness_var.set("   ".join(f"{dest}: {STATE_MARKS[state]}" if src == 'english' else f"{src}->{dest}: {STATE_MARKS[state]}"
+                                  for (src, dest), state in list(pair_states.items())))
+    root.after(250, refresh_readiness)
+
+def on_language_selected(event):
+    # Start loading a newly chosen target in the background, before the user clicks Translate
+    request_pair(('english', event.widget.get()))
+
+def on_output_language_selected(event):
+    global live_pieces
+    on_language_selected(event)
+    live_pieces = None
+    schedule_live_translation()
+
+output_lang_combo.bind("<<ComboboxSelected>>", on_output_language_selected)
+pdf_lang_combo.bind("<<ComboboxSelected>>", on_language_selected)
+
+Thread(target=start_translator, name="translator-startup", daemon=True).start()
+root.after(250, refresh_readiness)
+root.after(POLL_MS, poll_events)
+
+# Startup benchmark hook: close as soon as the window has been drawn (see benchmark.py)
+if os.environ.get('TRANSLATOR_STARTUP_PROBE'):
+    root.after_idle(lambda: (root.update(), print(f"startup_window_seconds={time.perf_counter() - started:.3f}"), root.destroy()))
 
 root.mainloop()
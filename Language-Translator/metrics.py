@@ -0,0 +1,252 @@
+import atexit
+import bisect
+import logging
+import os
+import threading
+import time
+
+# Counters, histograms and stage timers for the translation hot path, with pluggable exporters.
+# Disabled by default: every call then returns after one attribute check, and timer() hands back
+# a shared no-op context manager. Enable with the TRANSLATOR_METRICS environment variable:
+#
+#   TRANSLATOR_METRICS=log                          log lines on the 'translator.metrics' logger
+#   TRANSLATOR_METRICS=prometheus:/path/metrics.prom Prometheus text file (node_exporter textfile format)
+#   TRANSLATOR_METRICS=memory                       keep snapshots in memory, see InMemoryExporter
+#
+# Exporters run every TRANSLATOR_METRICS_INTERVAL seconds (default 15) and once at exit.
+# Step-by-step tracing goes to the standard logging module at DEBUG level.
+
+# Seconds; covers sub-millisecond tokenization up to multi-minute model downloads
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+# Segments per generate call
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+logger = logging.getLogger('translator.metrics')
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self):
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running += count
+            cumulative.append((bound, running))
+        return {'buckets': cumulative, 'sum': self.total, 'count': self.count}
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'labels', 'start')
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, TIME_BUCKETS, **self.labels)
+        return False
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+
+class Metrics:
+    def __init__(self, enabled=False, exporters=None):
+        self.enabled = enabled
+        self.exporters = list(exporters or [])
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.export_thread = None
+        self.stop_event = threading.Event()
+
+    def increment(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=TIME_BUCKETS, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def timer(self, name, **labels):
+        # with metrics.timer('stage_seconds', stage='generate'): ...
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'time': time.time(),
+                'counters': {key: value for key, value in self.counters.items()},
+                'histograms': {key: histogram.snapshot() for key, histogram in self.histograms.items()},
+            }
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def add_exporter(self, exporter):
+        self.exporters.append(exporter)
+
+    def export(self):
+        if not self.enabled or not self.exporters:
+            return
+        snapshot = self.snapshot()
+        for exporter in self.exporters:
+            try:
+                exporter.export(snapshot)
+            except Exception as e:
+                logger.warning("Metrics exporter %s failed: %s", type(exporter).__name__, e)
+
+    def start_exporting(self, interval=15):
+        # Background thread exporting every interval seconds; a final export runs at exit
+        if not self.enabled or self.export_thread is not None:
+            return
+
+        def run():
+            while not self.stop_event.wait(interval):
+                self.export()
+
+        self.export_thread = threading.Thread(target=run, name="metrics-exporter", daemon=True)
+        self.export_thread.start()
+        atexit.register(self.stop_exporting)
+
+    def stop_exporting(self):
+        self.stop_event.set()
+        self.export()
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+def prometheus_text(snapshot, prefix="translator_"):
+    lines = []
+    typed = set()
+    for (name, labels), value in sorted(snapshot['counters'].items()):
+        if name not in typed:
+            lines.append(f"# TYPE {prefix}{name} counter")
+            typed.add(name)
+        lines.append(f"{prefix}{name}{format_labels(labels)} {value}")
+    for (name, labels), histogram in sorted(snapshot['histograms'].items()):
+        if name not in typed:
+            lines.append(f"# TYPE {prefix}{name} histogram")
+            typed.add(name)
+        for bound, count in histogram['buckets']:
+            le = "+Inf" if bound == float('inf') else repr(bound)
+            lines.append(f"{prefix}{name}_bucket{format_labels(labels + (('le', le),))} {count}")
+        lines.append(f"{prefix}{name}_sum{format_labels(labels)} {histogram['sum']}")
+        lines.append(f"{prefix}{name}_count{format_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+class LogExporter:
+    def __init__(self, log=None, level=logging.INFO):
+        self.log = log or logger
+        self.level = level
+
+    def export(self, snapshot):
+        for (name, labels), value in sorted(snapshot['counters'].items()):
+            self.log.log(self.level, "%s%s %s", name, format_labels(labels), value)
+        for (name, labels), histogram in sorted(snapshot['histograms'].items()):
+            mean = histogram['sum'] / histogram['count'] if histogram['count'] else 0
+            self.log.log(self.level, "%s%s count=%d sum=%.4f mean=%.4f", name, format_labels(labels),
+                         histogram['count'], histogram['sum'], mean)
+
+
+class PrometheusFileExporter:
+    def __init__(self, path, prefix="translator_"):
+        self.path = path
+        self.prefix = prefix
+
+    def export(self, snapshot):
+        # Written to a temp file and renamed, so scrapers never read a partial file
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as metrics_file:
+            metrics_file.write(prometheus_text(snapshot, self.prefix))
+        os.replace(temp_path, self.path)
+
+
+class InMemoryExporter:
+    def __init__(self, max_snapshots=100):
+        self.max_snapshots = max_snapshots
+        self.snapshots = []
+
+    def export(self, snapshot):
+        self.snapshots.append(snapshot)
+        del self.snapshots[:-self.max_snapshots]
+
+    def latest(self):
+        return self.snapshots[-1] if self.snapshots else None
+
+
+def from_env(environ=os.environ):
+    setting = environ.get('TRANSLATOR_METRICS', '').strip()
+    if not setting or setting.lower() in ('0', 'off', 'false', 'none'):
+        return Metrics(enabled=False)
+
+    kind, _, argument = setting.partition(':')
+    kind = kind.lower()
+    if kind == 'prometheus':
+        exporter = PrometheusFileExporter(argument or 'translator_metrics.prom')
+    elif kind == 'memory':
+        exporter = InMemoryExporter()
+    else:
+        exporter = LogExporter()
+        if not logger.handlers:
+            # Without this the lines would be dropped by the root logger's default WARNING level
+            logger.addHandler(logging.StreamHandler())
+            logger.setLevel(logging.INFO)
+    instance = Metrics(enabled=True, exporters=[exporter])
+    try:
+        interval = float(environ.get('TRANSLATOR_METRICS_INTERVAL', 15))
+    except ValueError:
+        interval = 15
+    instance.start_exporting(interval)
+    return instance
+
+
+# Process-wide instance used by the translator, GUI and CLI
+metrics = from_env()
@@ -0,0 +1,174 @@
+import gc
+import threading
+import time
+from collections import OrderedDict
+
+
+def model_size_bytes(model):
+    # Resident size of a model's weights and buffers
+    size = 0
+    try:
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            size += tensor.numel() * tensor.element_size()
+    except Exception:
+        pass
+    return size
+
+
+class ModelEntry:
+    __slots__ = ('key', 'model', 'tokenizer', 'size_bytes', 'loaded_at', 'last_used')
+
+    def __init__(self, key, model, tokenizer):
+        self.key = key
+        self.model = model
+        self.tokenizer = tokenizer
+        self.size_bytes = model_size_bytes(model)
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+
+
+class ModelRegistry:
+    # Holds loaded model/tokenizer pairs, capped by count and total bytes.
+    # The least recently used pair is evicted first, and pairs idle longer than idle_ttl seconds are unloaded.
+    def __init__(self, max_models=4, max_bytes=None, idle_ttl=900, reap_interval=60):
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.reap_interval = reap_interval
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.load_locks = {}
+        self.reaper = None
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            entry.last_used = time.time()
+            self.entries.move_to_end(key)
+            return entry.model, entry.tokenizer
+
+    def get_or_load(self, key, loader):
+        # loader() returns (model, tokenizer). Concurrent requests for the same key wait
+        # for the first load instead of loading the model twice.
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with self.lock:
+            load_lock = self.load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+            model, tokenizer = loader()
+            self.put(key, model, tokenizer)
+            return model, tokenizer
+
+    def put(self, key, model, tokenizer):
+        entry = ModelEntry(key, model, tokenizer)
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            evicted = self._evict_over_limit()
+        self._release(evicted)
+        self._start_reaper()
+
+    def remove(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+        if entry is not None:
+            self._release([entry])
+        return entry is not None
+
+    def clear(self):
+        with self.lock:
+            evicted = list(self.entries.values())
+            self.entries.clear()
+        self._release(evicted)
+
+    def evict_idle(self):
+        if not self.idle_ttl:
+            return []
+        cutoff = time.time() - self.idle_ttl
+        with self.lock:
+            evicted = [entry for entry in self.entries.values() if entry.last_used < cutoff]
+            for entry in evicted:
+                del self.entries[entry.key]
+        for entry in evicted:
+            print(f"Unloading idle model {entry.key}")
+        self._release(evicted)
+        return [entry.key for entry in evicted]
+
+    def total_bytes(self):
+        with self.lock:
+            return sum(entry.size_bytes for entry in self.entries.values())
+
+    def memory_report(self):
+        # One row per resident model, least recently used first
+        now = time.time()
+        with self.lock:
+            return [
+                {
+                    'key': entry.key,
+                    'size_mb': round(entry.size_bytes / (1024 * 1024), 1),
+                    'idle_seconds': round(now - entry.last_used, 1),
+                    'loaded_seconds': round(now - entry.loaded_at, 1),
+                }
+                for entry in self.entries.values()
+            ]
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def _evict_over_limit(self):
+        # Called with self.lock held. The most recently inserted entry is never evicted.
+        evicted = []
+        while len(self.entries) > 1:
+            over_count = self.max_models is not None and len(self.entries) > self.max_models
+            over_bytes = self.max_bytes is not None and sum(entry.size_bytes for entry in self.entries.values()) > self.max_bytes
+            if not over_count and not over_bytes:
+                break
+            key, entry = self.entries.popitem(last=False)
+            print(f"Evicting least recently used model {key}")
+            evicted.append(entry)
+        return evicted
+
+    def _release(self, entries):
+        if not entries:
+            return
+        self.evictions += len(entries)
+        for entry in entries:
+            entry.model = None
+            entry.tokenizer = None
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    def _start_reaper(self):
+        if not self.idle_ttl:
+            return
+
+        def reap():
+            while True:
+                time.sleep(self.reap_interval)
+                self.evict_idle()
+
+        with self.lock:
+            if self.reaper is not None:
+                return
+            self.reaper = threading.Thread(target=reap, name="model-registry-reaper", daemon=True)
+        self.reaper.start()
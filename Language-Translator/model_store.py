@@ -0,0 +1,230 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+# Managed store of installed translation models for hosts without network access.
+# Models are imported from local directories, saved as safetensors (no pickled code, and a
+# damaged file fails its hash check) and listed in a manifest with file sizes and hashes.
+# A model in the manifest is loaded straight from its directory with no Hugging Face lookup.
+#
+#   python -m model_store import /media/models/opus-mt-en-de --pair en:de
+#   python -m model_store import-cached Helsinki-NLP/opus-mt-en-fr
+#   python -m model_store list
+#   python -m model_store verify
+
+MANIFEST_VERSION = 1
+
+
+class ModelStoreError(Exception):
+    pass
+
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_dir():
+    return os.path.join(os.path.expanduser("~"), ".cache", "language_translator_models")
+
+
+class ModelStore:
+    def __init__(self, cache_dir=None, dirname="store"):
+        self.root = os.path.join(cache_dir or default_cache_dir(), dirname)
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self.lock = threading.Lock()
+        self.models = {}
+        self.manifest_mtime = None
+        self._load()
+
+    def _load(self):
+        try:
+            self.manifest_mtime = os.path.getmtime(self.manifest_path)
+            with open(self.manifest_path, encoding='utf-8') as manifest_file:
+                self.models = json.load(manifest_file).get('models', {})
+        except (OSError, ValueError):
+            self.models = {}
+
+    def _refresh(self):
+        # Picks up models imported by another process (e.g. the CLI while the GUI is running)
+        try:
+            mtime = os.path.getmtime(self.manifest_path)
+        except OSError:
+            mtime = None
+        if mtime != self.manifest_mtime:
+            self._load()
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump({'version': MANIFEST_VERSION, 'models': self.models}, manifest_file, indent=1, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+        self.manifest_mtime = os.path.getmtime(self.manifest_path)
+
+    def manifest_state(self):
+        # Changes whenever a model is imported or removed, by this or another process
+        try:
+            return os.path.getmtime(self.manifest_path)
+        except OSError:
+            return None
+
+    def model_dir(self, model_name):
+        return os.path.join(self.root, model_name.replace("/", "--"))
+
+    def resolve(self, model_name):
+        # Directory and revision of an installed model, or None. Only file sizes are checked here;
+        # verify() re-hashes the files.
+        with self.lock:
+            self._refresh()
+            entry = self.models.get(model_name)
+        if entry is None:
+            return None
+        path = self.model_dir(model_name)
+        for name, info in entry['files'].items():
+            file_path = os.path.join(path, name)
+            if not os.path.isfile(file_path) or os.path.getsize(file_path) != info['size']:
+                raise ModelStoreError(f"{model_name} in the model store is incomplete or modified ({name}); "
+                                      f"re-import it with: python -m model_store import")
+        return path, entry['revision']
+
+    def installed(self):
+        with self.lock:
+            self._refresh()
+            return {name: dict(entry) for name, entry in self.models.items()}
+
+    def import_model(self, source, model_name, revision=None):
+        # Copies a MarianMT model and tokenizer from a local directory (or a model already in the
+        # Hugging Face cache, when source is a model id) into the store as safetensors
+        from transformers import MarianMTModel, MarianTokenizer
+
+        tokenizer = MarianTokenizer.from_pretrained(source, local_files_only=True)
+        model = MarianMTModel.from_pretrained(source, local_files_only=True)
+        revision = revision or getattr(model.config, '_commit_hash', None)
+
+        target = self.model_dir(model_name)
+        staging = target + ".importing"
+        shutil.rmtree(staging, ignore_errors=True)
+        model.save_pretrained(staging, safe_serialization=True)
+        tokenizer.save_pretrained(staging)
+
+        files = {}
+        for name in sorted(os.listdir(staging)):
+            file_path = os.path.join(staging, name)
+            if os.path.isfile(file_path):
+                files[name] = {'size': os.path.getsize(file_path), 'sha256': sha256_file(file_path)}
+        if revision is None:
+            # No hub revision for a plain directory: identify it by its weights
+            revision = "sha256-" + files["model.safetensors"]['sha256'][:16]
+
+        with self.lock:
+            shutil.rmtree(target, ignore_errors=True)
+            os.replace(staging, target)
+            self.models[model_name] = {
+                'revision': revision,
+                'format': 'safetensors',
+                'files': files,
+                'source': os.path.abspath(source) if os.path.isdir(source) else source,
+                'installed': time.time(),
+            }
+            self._save()
+        return self.models[model_name]
+
+    def verify(self, model_name=None):
+        # {model_name: [problems]}; an empty list means every file matches the manifest
+        results = {}
+        for name, entry in self.installed().items():
+            if model_name is not None and name != model_name:
+                continue
+            problems = []
+            path = self.model_dir(name)
+            for file_name, info in entry['files'].items():
+                file_path = os.path.join(path, file_name)
+                if not os.path.isfile(file_path):
+                    problems.append(f"missing {file_name}")
+                elif os.path.getsize(file_path) != info['size'] or sha256_file(file_path) != info['sha256']:
+                    problems.append(f"checksum mismatch in {file_name}")
+            results[name] = problems
+        return results
+
+    def remove(self, model_name):
+        with self.lock:
+            if self.models.pop(model_name, None) is None:
+                return False
+            shutil.rmtree(self.model_dir(model_name), ignore_errors=True)
+            self._save()
+        return True
+
+
+def _model_name_for(args):
+    if args.name:
+        return args.name
+    if args.pair:
+        from translator import LANGUAGE_CODE_MAP, language_name
+        src, _, dest = args.pair.partition(':')
+        if not dest:
+            raise SystemExit("--pair must look like en:de")
+        # Name the model the way TextTranslator looks it up, without constructing a translator
+        codes = {name: code for code, name in LANGUAGE_CODE_MAP.items()}
+        return f"Helsinki-NLP/opus-mt-{codes.get(language_name(src), src)}-{codes.get(language_name(dest), dest)}"
+    raise SystemExit("give the model name with --name or the language pair with --pair")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m model_store", description="Manage the offline translation model store.")
+    parser.add_argument("--cache-dir", help="translator cache directory (default: ~/.cache/language_translator_models)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="import a model directory from a local path")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--name", help="model name, e.g. Helsinki-NLP/opus-mt-en-de")
+    import_parser.add_argument("--pair", help="language pair the model translates, e.g. en:de")
+
+    cached_parser = subparsers.add_parser("import-cached", help="import a model already in the Hugging Face cache")
+    cached_parser.add_argument("name")
+
+    subparsers.add_parser("list", help="list installed models")
+    verify_parser = subparsers.add_parser("verify", help="re-hash installed files and report mismatches")
+    verify_parser.add_argument("name", nargs="?")
+    remove_parser = subparsers.add_parser("remove", help="uninstall a model")
+    remove_parser.add_argument("name")
+    args = parser.parse_args(argv)
+
+    store = ModelStore(args.cache_dir)
+    if args.command == "import":
+        model_name = _model_name_for(args)
+        entry = store.import_model(args.path, model_name)
+        print(f"Installed {model_name} (revision {entry['revision']})")
+    elif args.command == "import-cached":
+        # Same cache directory TextTranslator downloads into
+        from huggingface_hub import snapshot_download
+        path = snapshot_download(args.name, cache_dir=args.cache_dir or default_cache_dir(), local_files_only=True)
+        entry = store.import_model(path, args.name, revision=os.path.basename(path))
+        print(f"Installed {args.name} (revision {entry['revision']})")
+    elif args.command == "list":
+        for name, entry in sorted(store.installed().items()):
+            size_mb = sum(info['size'] for info in entry['files'].values()) / (1024 * 1024)
+            print(f"{name}  revision {entry['revision']}  {size_mb:.1f} MB  from {entry['source']}")
+    elif args.command == "verify":
+        failed = False
+        for name, problems in sorted(store.verify(args.name).items()):
+            print(f"{name}: {'ok' if not problems else ', '.join(problems)}")
+            failed = failed or bool(problems)
+        return 1 if failed else 0
+    elif args.command == "remove":
+        if not store.remove(args.name):
+            print(f"{args.name} is not installed")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Process-pool translation for CPU-only hosts. Each worker process loads the pair's model once,
+# runs torch with its share of the cores, and takes page ranges or segment batches from the
+# pool's shared task queue. Results come back in document order.
+
+
+def physical_core_count():
+    try:
+        import psutil
+        count = psutil.cpu_count(logical=False)
+        if count:
+            return count
+    except ImportError:
+        pass
+    # Without psutil assume two hardware threads per core
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+_worker_translator = None
+
+
+def _init_worker(src, dest, torch_threads, decoding):
+    global _worker_translator
+    # Keep stdout free for the parent (e.g. the CLI text mode); progress goes to stderr
+    sys.stdout = sys.stderr
+
+    import torch
+    torch.set_num_threads(torch_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Already set in this process
+        pass
+
+    from translator import TextTranslator
+    _worker_translator = TextTranslator(decoding_profile=decoding)
+    # Load the model up front so the first task does not pay for it
+    _worker_translator.load_model(src, dest)
+
+
+def _run_with_stats(function, *args):
+    # Returns the task result with the worker's segment/token counts for that task,
+    # so the parent can report throughput
+    before = dict(_worker_translator.stats)
+    result = function(*args)
+    return result, {key: _worker_translator.stats[key] - before[key] for key in before}
+
+
+def _translate_segments(texts, src, dest, batch_size):
+    return _run_with_stats(_worker_translator.translate_batch, texts, src, dest, batch_size)
+
+
+def _translate_page_range(path, start, stop, src, dest, window):
+    import pdf_utils
+
+    def translate_range():
+        pages = pdf_utils.iter_pdf_pages(path, start, stop)
+        return list(pdf_utils.translate_pdf_pages(pages, src, dest, window, text_translator=_worker_translator))
+
+    return _run_with_stats(translate_range)
+
+
+class TranslationPool:
+    # A pool of worker processes bound to one language pair
+    def __init__(self, src, dest, processes=None, torch_threads=None, decoding='quality'):
+        cores = physical_core_count()
+        self.processes = processes or cores
+        self.torch_threads = torch_threads or max(1, cores // self.processes)
+        self.src = src
+        self.dest = dest
+        self.stats = {'segments': 0, 'tokens_in': 0, 'tokens_out': 0, 'tokenize_seconds': 0.0, 'generate_seconds': 0.0}
+        self.stats_lock = threading.Lock()
+        print(f"Starting {self.processes} translation processes with {self.torch_threads} torch threads each")
+
+        # spawn avoids forking a parent that already has torch thread pools running
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(src, dest, self.torch_threads, decoding),
+        )
+
+    def translate_segments(self, texts, batch_size=16):
+        # Sort by length so every task holds similarly sized segments, then restore input order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        tasks = [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+        futures = [
+            self.executor.submit(_translate_segments, [texts[i] for i in task], self.src, self.dest, batch_size)
+            for task in tasks
+        ]
+
+        results = [""] * len(texts)
+        for task, future in zip(tasks, futures):
+            for i, translated in zip(task, self._result(future)):
+                results[i] = translated
+        return results
+
+    def _result(self, future):
+        result, stats = future.result()
+        with self.stats_lock:
+            for key, value in stats.items():
+                self.stats[key] += value
+        return result
+
+    def iter_pdf_pages(self, path, pages_per_task=4, window=4):
+        # Yields translated page texts in document order while later page ranges are still running
+        import pdf_utils
+        page_count = pdf_utils.count_pdf_pages(path)
+        futures = [
+            self.executor.submit(_translate_page_range, path, start, min(start + pages_per_task, page_count),
+                                 self.src, self.dest, window)
+            for start in range(0, page_count, pages_per_task)
+        ]
+        try:
+            for future in futures:
+                yield from self._result(future)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def translate_pdf(self, input_path, output_path, pages_per_task=4, window=4, page_callback=None):
+        import pdf_utils
+
+        def report(pages):
+            for page_number, translated_page in enumerate(pages, 1):
+                if page_callback:
+                    page_callback(page_number, translated_page)
+                yield translated_page
+
+        return pdf_utils.write_pdf(report(self.iter_pdf_pages(input_path, pages_per_task, window)), output_path)
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
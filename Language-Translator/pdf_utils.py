@@ -6,60 +6,152 @@ except ImportError:
     print("Error importing fitz (PyMuPDF) in pdf_utils")
     FITZ_AVAILABLE = False
 
-from translator import TextTranslator
-import torch
+from translator import get_translator
+from segmenter import segment_text, join_segments
+from metrics import metrics
+import os
 
-# Initialize the translator with deep learning models
-translator = TextTranslator()
+def count_pdf_pages(path):
+    if not FITZ_AVAILABLE:
+        return 0
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+def iter_pdf_pages(path, start=0, stop=None):
+    # Yields the text of pages [start, stop) in order; pages are only loaded as they are consumed
+    if not FITZ_AVAILABLE:
+        raise RuntimeError("PDF extraction not available - PyMuPDF not installed")
+    
+    with fitz.open(path) as doc:
+        stop = doc.page_count if stop is None else min(stop, doc.page_count)
+        for page_number in range(start, stop):
+            yield doc[page_number].get_text()
 
 def extract_pdf_text(path):
     if not FITZ_AVAILABLE:
         return "PDF extraction not available - PyMuPDF not installed"
     
     try:
-        doc = fitz.open(path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        return text
+        import extraction
+        return "".join(page.text for page in extraction.extract_pages(path))
     except Exception as e:
         return f"Error extracting PDF text: {str(e)}"
 
 def translate_pdf_text(text, src, dest):
-    # Break the text into chunks to avoid exceeding model capacity
-    max_chunk_size = 500  # Characters
-    chunks = [text[i:i+max_chunk_size] for i in range(0, len(text), max_chunk_size)]
+    # Break the text into sentence-aligned segments that fit the model's token budget
+    translator = get_translator()
+    segments = segment_text(text, translator.get_token_counter(src, dest))
+    
+    # Translate all segments together in padded batches
+    translated_segments = translator.translate_batch([segment.text for segment in segments], src, dest)
     
-    translated_chunks = []
-    for chunk in chunks:
-        translated = translator.translate_text(chunk, src, dest)
-        translated_chunks.append(translated)
+    # Put the translations back into the original paragraph layout
+    return join_segments(text, segments, translated_segments)
+
+def translate_pdf_pages(pages, src, dest, window=4, text_translator=None, decoding=None):
+    # Generator over translated page texts. Pages are pulled from `pages` a window at a time,
+    # the segments of the whole window are translated in one batched call, and each page is
+    # yielded as soon as its window is done, so memory stays bounded by the window size.
+    text_translator = text_translator or get_translator()
+    count_tokens = text_translator.get_token_counter(src, dest)
+    
+    window_pages = []
+    for page_text in pages:
+        window_pages.append(page_text)
+        if len(window_pages) >= window:
+            yield from _translate_window(window_pages, src, dest, count_tokens, text_translator, decoding)
+            window_pages = []
+    
+    if window_pages:
+        yield from _translate_window(window_pages, src, dest, count_tokens, text_translator, decoding)
+
+def _translate_window(window_pages, src, dest, count_tokens, text_translator, decoding):
+    page_segments = [segment_text(page_text, count_tokens) for page_text in window_pages]
+    all_texts = [segment.text for segments in page_segments for segment in segments]
+    translated = text_translator.translate_batch(all_texts, src, dest, decoding=decoding)
+    metrics.increment('pdf_pages_total', len(window_pages))
     
-    return ' '.join(translated_chunks)
+    position = 0
+    for page_text, segments in zip(window_pages, page_segments):
+        page_translations = translated[position:position + len(segments)]
+        position += len(segments)
+        yield join_segments(page_text, segments, page_translations)
 
-def write_pdf(output_text, output_path):
+def translate_pdf(input_path, output_path, src, dest, window=4, page_callback=None, text_translator=None, decoding=None):
+    # Streaming extract -> translate -> write. page_callback(page_number, translated_text) is
+    # called as each page is finished.
+    pages = translate_pdf_pages(iter_pdf_pages(input_path), src, dest, window, text_translator, decoding)
+    
+    def report(pages):
+        for page_number, translated_page in enumerate(pages, 1):
+            if page_callback:
+                page_callback(page_number, translated_page)
+            yield translated_page
+    
+    return write_pdf(report(pages), output_path)
+
+def _write_text_page(doc, text):
+    page = doc.new_page()
+    rect = fitz.Rect(72, 72, page.rect.width - 72, page.rect.height - 72)
+    if page.insert_textbox(rect, text, fontsize=11) >= 0 or len(text) < 2:
+        return
+    
+    # Too long for one page: drop it and split the text in half at a whitespace boundary
+    doc.delete_page(-1)
+    middle = len(text) // 2
+    cut = text.rfind(' ', 0, middle)
+    if cut <= 0:
+        cut = middle
+    _write_text_page(doc, text[:cut])
+    _write_text_page(doc, text[cut:].lstrip())
+
+def write_pdf(output_pages, output_path, chars_per_page=3000, flush_every=10):
+    # output_pages is either the full text or an iterable of page texts (e.g. the generator
+    # from translate_pdf_pages). Each page is written as it arrives and the file on disk is
+    # updated incrementally, so early pages are readable before the whole document is done.
     if not FITZ_AVAILABLE:
         return False
     
+    if isinstance(output_pages, str):
+        output_pages = [output_pages]
+    
     try:
         doc = fitz.open()
+        saved = False
+        written = 0
         
-        # Split the text into pages (roughly 3000 characters per page)
-        text_length = len(output_text)
-        chars_per_page = 3000
-        num_pages = max(1, text_length // chars_per_page + (1 if text_length % chars_per_page > 0 else 0))
-        
-        for i in range(num_pages):
-            page = doc.new_page()
-            start_idx = i * chars_per_page
-            end_idx = min((i + 1) * chars_per_page, text_length)
-            page_text = output_text[start_idx:end_idx]
+        for page_text in output_pages:
+            # Split long pages into roughly chars_per_page pieces at whitespace
+            while len(page_text) > chars_per_page:
+                cut = page_text.rfind(' ', 0, chars_per_page)
+                if cut <= 0:
+                    cut = chars_per_page
+                _write_text_page(doc, page_text[:cut])
+                page_text = page_text[cut:].lstrip()
+            _write_text_page(doc, page_text)
+            written += 1
             
-            # Insert text
-            page.insert_text((72, 72), page_text, fontsize=12)
+            # Put the first page on disk right away, then append updates every flush_every pages
+            if not saved:
+                doc.save(output_path)
+                doc.close()
+                doc = fitz.open(output_path)
+                saved = True
+            elif written % flush_every == 0:
+                doc.saveIncr()
+        
+        if not saved:
+            # Nothing to write: keep the old behaviour of producing a single empty page
+            doc.new_page()
+            doc.save(output_path)
+            doc.close()
+            return True
         
-        doc.save(output_path)
+        # Rewrite the finished document compactly over the incremental saves
+        temp_path = output_path + ".tmp"
+        doc.save(temp_path, garbage=3, deflate=True)
         doc.close()
+        os.replace(temp_path, output_path)
         return True
     except Exception as e:
         print(f"Error writing PDF: {str(e)}")
@@ -0,0 +1,320 @@
+import argparse
+import contextlib
+import copy
+import json
+import math
+import os
+import re
+import time
+from collections import Counter
+
+import torch
+
+# Dynamic int8 quantization of MarianMT models for CPU inference, a cache of the quantized
+# models next to the Hugging Face cache, and a comparison of speed and quality against fp32.
+#
+#   python -m quantization --src english --dest french
+#   python -m quantization --src english --dest german --samples sentences.txt --references german.txt
+
+SAMPLE_SENTENCES = [
+    "Hello, how are you today?",
+    "The meeting has been moved to Thursday afternoon.",
+    "Please read the attached document carefully before signing it.",
+    "The weather was cold, but the children still wanted to play outside.",
+    "Our company was founded in 1998 and now employs more than two thousand people.",
+    "If you have any questions, do not hesitate to contact our support team.",
+    "The train to the airport leaves every fifteen minutes.",
+    "Scientists have discovered a new species of frog in the rainforest.",
+]
+
+
+def quantize_model(model):
+    # Replace every nn.Linear with a dynamically quantized int8 version (weights int8, activations quantized on the fly)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def local_revision(cache_dir, model_name):
+    # Commit hash of the locally cached Hugging Face snapshot, read without any network access
+    ref_path = os.path.join(cache_dir, "models--" + model_name.replace("/", "--"), "refs", "main")
+    try:
+        with open(ref_path) as ref_file:
+            return ref_file.read().strip()
+    except OSError:
+        return None
+
+
+def quantized_cache_path(cache_dir, model_name, revision):
+    safe_name = model_name.replace("/", "--")
+    return os.path.join(cache_dir, "quantized", f"{safe_name}-{revision}-torch{torch.__version__}.int8.safetensors")
+
+
+def _skip_weight_init():
+    # The skeleton's weights are overwritten by the cached tensors, so random init is wasted work
+    try:
+        from transformers.initialization import no_init_weights
+    except ImportError:
+        try:
+            from transformers.modeling_utils import no_init_weights
+        except ImportError:
+            return contextlib.nullcontext()
+    return no_init_weights()
+
+
+def _quantized_linears(model):
+    return {name: module for name, module in model.named_modules() if isinstance(module, torch.ao.nn.quantized.dynamic.Linear)}
+
+
+def load_quantized(cache_dir, model_name, revision=None):
+    # Returns the cached quantized model for the current revision, or None.
+    # revision defaults to the locally cached Hugging Face snapshot.
+    # The cache is a safetensors file of plain tensors: the model is rebuilt from its config,
+    # quantized empty, and the int8 weights of each Linear are packed back into it.
+    revision = revision or local_revision(cache_dir, model_name)
+    if revision is None:
+        return None
+    path = quantized_cache_path(cache_dir, model_name, revision)
+    if not os.path.exists(path):
+        return None
+    try:
+        from safetensors import safe_open
+        from transformers import GenerationConfig, MarianConfig, MarianMTModel
+
+        with safe_open(path, framework="pt", device="cpu") as cached:
+            metadata = cached.metadata()
+            tensors = {key: cached.get_tensor(key) for key in cached.keys()}
+        with _skip_weight_init():
+            model = MarianMTModel(MarianConfig.from_dict(json.loads(metadata['config'])))
+
+        # Everything but the Linear layers goes into the fp32 skeleton; tied weights (the shared
+        # embeddings) are stored once under their first name
+        linear_keys = {key for key in tensors if key.endswith((".weight_int8", ".weight_scale", ".weight_zero_point"))}
+        linear_names = {key.rsplit(".", 1)[0] for key in linear_keys}
+        float_tensors = {key: value for key, value in tensors.items()
+                         if key not in linear_keys and not (key.endswith(".bias") and key[:-5] in linear_names)}
+        for alias, key in json.loads(metadata['aliases']).items():
+            float_tensors[alias] = float_tensors[key]
+        missing, unexpected = model.load_state_dict(float_tensors, strict=False)
+        missing = [key for key in missing if key.rsplit(".", 1)[0] not in linear_names]
+        if missing or unexpected:
+            raise ValueError(f"cached weights do not match the model (missing {missing}, unexpected {unexpected})")
+
+        model = quantize_model(model.eval())
+        linears = _quantized_linears(model)
+        if set(linears) != linear_names:
+            raise ValueError("cached int8 layers do not match the model")
+        for name, module in linears.items():
+            weight = torch._make_per_tensor_quantized_tensor(tensors[f"{name}.weight_int8"],
+                                                             tensors[f"{name}.weight_scale"].item(),
+                                                             tensors[f"{name}.weight_zero_point"].item())
+            module.set_weight_bias(weight, tensors.get(f"{name}.bias"))
+
+        model.generation_config = GenerationConfig.from_dict(json.loads(metadata['generation_config']))
+        model.is_int8_quantized = True
+        print(f"Loaded quantized model from {path}")
+        return model
+    except Exception as e:
+        print(f"Could not load quantized model from {path}: {e}")
+        return None
+
+
+def save_quantized(cache_dir, model_name, model, revision=None):
+    # Stores the int8 weights as plain tensors (int8 values, scale, zero point and float bias per
+    # Linear); torch.save would pickle the quantized tensors' qscheme objects instead
+    revision = revision or local_revision(cache_dir, model_name)
+    if revision is None:
+        return None
+    path = quantized_cache_path(cache_dir, model_name, revision)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + ".tmp"
+    try:
+        from safetensors.torch import save_file
+
+        tensors = {}
+        linears = _quantized_linears(model)
+        for name, module in linears.items():
+            weight = module.weight()
+            if weight.qscheme() != torch.per_tensor_affine:
+                raise ValueError(f"unsupported quantization scheme {weight.qscheme()} in {name}")
+            tensors[f"{name}.weight_int8"] = weight.int_repr()
+            tensors[f"{name}.weight_scale"] = torch.tensor([weight.q_scale()], dtype=torch.float64)
+            tensors[f"{name}.weight_zero_point"] = torch.tensor([weight.q_zero_point()], dtype=torch.int64)
+            if module.bias() is not None:
+                tensors[f"{name}.bias"] = module.bias().detach().contiguous()
+
+        aliases = {}
+        first_keys = {}
+        linear_prefixes = tuple(name + "." for name in linears)
+        for key, value in model.state_dict().items():
+            if not isinstance(value, torch.Tensor) or key.startswith(linear_prefixes):
+                continue
+            first_key = first_keys.setdefault(value.data_ptr(), key)
+            if first_key != key:
+                aliases[key] = first_key
+            else:
+                tensors[key] = value.detach().contiguous()
+
+        save_file(tensors, temp_path, metadata={
+            'config': model.config.to_json_string(use_diff=False),
+            'generation_config': model.generation_config.to_json_string(use_diff=False),
+            'aliases': json.dumps(aliases),
+        })
+        os.replace(temp_path, path)
+        print(f"Saved quantized model to {path}")
+        return path
+    except Exception as e:
+        print(f"Could not save quantized model to {path}: {e}")
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        return None
+
+
+def configure_threads(intra_op_threads=None, inter_op_threads=None):
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError as e:
+            # Can only be set before the first parallel operation in the process
+            print(f"Could not set inter-op threads: {e}")
+
+
+def _tokens(text):
+    return re.findall(r"\w+|[^\w\s]", text, re.UNICODE)
+
+
+def corpus_bleu(hypotheses, references, max_order=4):
+    # Corpus BLEU with brevity penalty, on word/punctuation tokens (0-100)
+    matches = [0] * max_order
+    totals = [0] * max_order
+    hypothesis_length = 0
+    reference_length = 0
+    for hypothesis, reference in zip(hypotheses, references):
+        hypothesis_tokens = _tokens(hypothesis)
+        reference_tokens = _tokens(reference)
+        hypothesis_length += len(hypothesis_tokens)
+        reference_length += len(reference_tokens)
+        for order in range(1, max_order + 1):
+            hypothesis_ngrams = Counter(tuple(hypothesis_tokens[i:i + order]) for i in range(len(hypothesis_tokens) - order + 1))
+            reference_ngrams = Counter(tuple(reference_tokens[i:i + order]) for i in range(len(reference_tokens) - order + 1))
+            matches[order - 1] += sum((hypothesis_ngrams & reference_ngrams).values())
+            totals[order - 1] += max(0, len(hypothesis_tokens) - order + 1)
+
+    # Short samples may have no n-grams of the higher orders; only score the orders present,
+    # and floor zero matches so one missing order does not zero the whole score
+    orders = [i for i in range(max_order) if totals[i] > 0]
+    if hypothesis_length == 0 or not orders:
+        return 0.0
+    log_precision = sum(math.log(max(matches[i], 0.1) / totals[i]) for i in orders) / len(orders)
+    brevity_penalty = 1.0 if hypothesis_length > reference_length else math.exp(1 - reference_length / hypothesis_length)
+    return 100 * brevity_penalty * math.exp(log_precision)
+
+
+def corpus_chrf(hypotheses, references, max_order=6, beta=2):
+    # Character n-gram F-score (chrF), averaged over n-gram orders (0-100)
+    precisions = []
+    recalls = []
+    for order in range(1, max_order + 1):
+        matched = hypothesis_total = reference_total = 0
+        for hypothesis, reference in zip(hypotheses, references):
+            hypothesis_chars = hypothesis.replace(" ", "")
+            reference_chars = reference.replace(" ", "")
+            hypothesis_ngrams = Counter(hypothesis_chars[i:i + order] for i in range(len(hypothesis_chars) - order + 1))
+            reference_ngrams = Counter(reference_chars[i:i + order] for i in range(len(reference_chars) - order + 1))
+            matched += sum((hypothesis_ngrams & reference_ngrams).values())
+            hypothesis_total += sum(hypothesis_ngrams.values())
+            reference_total += sum(reference_ngrams.values())
+        if hypothesis_total and reference_total:
+            precisions.append(matched / hypothesis_total)
+            recalls.append(matched / reference_total)
+    if not precisions:
+        return 0.0
+    precision = sum(precisions) / len(precisions)
+    recall = sum(recalls) / len(recalls)
+    if precision + recall == 0:
+        return 0.0
+    return 100 * (1 + beta ** 2) * precision * recall / (beta ** 2 * precision + recall)
+
+
+def _timed_translate(translator, model, tokenizer, samples, inference_mode, repeats):
+    context = torch.inference_mode if inference_mode else torch.no_grad
+    outputs = None
+    start = time.perf_counter()
+    for _ in range(repeats):
+        with context():
+            outputs = translator._generate_batch(samples, model, tokenizer)
+    return outputs, (time.perf_counter() - start) / repeats
+
+
+def compare_profiles(translator, src_lang, dest_lang, samples=None, references=None, repeats=3):
+    # Translates samples with the fp32 model and an int8 copy, bypassing the translation memory.
+    # Quality is scored against references when given, otherwise against the fp32 output.
+    samples = samples or SAMPLE_SENTENCES
+    model, tokenizer = translator.load_model(src_lang, dest_lang)
+    if model is None:
+        raise ValueError(f"No direct model for {src_lang} to {dest_lang} to compare")
+
+    fp32_model = model if getattr(translator, 'inference_profile', 'default') != 'int8' else None
+    if fp32_model is None:
+        raise ValueError("Compare with a translator using the default (fp32) inference profile")
+    int8_model = quantize_model(copy.deepcopy(fp32_model).to("cpu"))
+
+    # Warm up both models so one-off allocation cost does not skew timing
+    translator._generate_batch(samples[:1], fp32_model, tokenizer)
+    translator._generate_batch(samples[:1], int8_model, tokenizer)
+
+    fp32_output, fp32_seconds = _timed_translate(translator, fp32_model, tokenizer, samples, False, repeats)
+    int8_output, int8_seconds = _timed_translate(translator, int8_model, tokenizer, samples, True, repeats)
+
+    result = {
+        'pair': f"{src_lang}->{dest_lang}",
+        'samples': len(samples),
+        'fp32_seconds': round(fp32_seconds, 4),
+        'int8_seconds': round(int8_seconds, 4),
+        'speedup': round(fp32_seconds / int8_seconds, 2) if int8_seconds else None,
+    }
+    if references:
+        fp32_bleu = corpus_bleu(fp32_output, references)
+        int8_bleu = corpus_bleu(int8_output, references)
+        fp32_chrf = corpus_chrf(fp32_output, references)
+        int8_chrf = corpus_chrf(int8_output, references)
+        result.update({
+            'fp32_bleu': round(fp32_bleu, 2), 'int8_bleu': round(int8_bleu, 2), 'bleu_delta': round(int8_bleu - fp32_bleu, 2),
+            'fp32_chrf': round(fp32_chrf, 2), 'int8_chrf': round(int8_chrf, 2), 'chrf_delta': round(int8_chrf - fp32_chrf, 2),
+        })
+    else:
+        # Agreement with fp32: 100 means the int8 model produced identical output
+        bleu = corpus_bleu(int8_output, fp32_output)
+        chrf = corpus_chrf(int8_output, fp32_output)
+        result.update({
+            'bleu_vs_fp32': round(bleu, 2), 'bleu_delta': round(bleu - 100, 2),
+            'chrf_vs_fp32': round(chrf, 2), 'chrf_delta': round(chrf - 100, 2),
+        })
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m quantization", description="Compare int8 and fp32 inference speed and quality for a language pair.")
+    parser.add_argument("--src", default="english")
+    parser.add_argument("--dest", required=True)
+    parser.add_argument("--samples", help="file with one source sentence per line (default: built-in samples)")
+    parser.add_argument("--references", help="file with one reference translation per line")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    def read_lines(path):
+        with open(path, encoding="utf-8") as lines:
+            return [line.strip() for line in lines if line.strip()]
+
+    samples = read_lines(args.samples) if args.samples else None
+    references = read_lines(args.references) if args.references else None
+
+    from translator import TextTranslator, language_name
+    translator = TextTranslator()
+    result = compare_profiles(translator, language_name(args.src), language_name(args.dest), samples, references, args.repeats)
+    for key, value in result.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+import time
+
+# Remembers which translation models exist so a missing direct model is only probed once.
+# Without this, every call for a pair like french->german retried the direct model lookup,
+# including a download attempt, before falling back to the English pivot.
+
+ROUTE_DIRECT = 'direct'
+ROUTE_PIVOT = 'pivot'
+
+
+def is_missing_model_error(error):
+    # Distinguishes "this model does not exist" from transient failures such as no network,
+    # which should not be remembered
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if 'RepositoryNotFoundError' in names or 'EntryNotFoundError' in names:
+        return True
+    message = str(error)
+    return 'is not a valid model identifier' in message or '404 Client Error' in message
+
+
+class RoutePlanner:
+    def __init__(self, cache_dir, missing_ttl=24 * 3600, filename="routes.json"):
+        # Models recorded as missing are probed again after missing_ttl seconds,
+        # in case they were published or installed in the meantime
+        self.path = os.path.join(cache_dir, filename)
+        self.missing_ttl = missing_ttl
+        self.lock = threading.Lock()
+        self.models = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as routes_file:
+                self.models = json.load(routes_file)
+        except (OSError, ValueError):
+            self.models = {}
+
+    def _save(self):
+        try:
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as routes_file:
+                json.dump(self.models, routes_file, indent=1, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not save route table: {e}")
+
+    def is_missing(self, model_name):
+        # True if the model failed to load recently enough that it should not be probed again
+        with self.lock:
+            entry = self.models.get(model_name)
+            if entry is None or entry['available']:
+                return False
+            return time.time() - entry['checked'] < self.missing_ttl
+
+    def record(self, model_name, available, reason=None):
+        with self.lock:
+            previous = self.models.get(model_name)
+            if previous is not None and previous['available'] == available and available:
+                return
+            self.models[model_name] = {'available': available, 'checked': time.time()}
+            if reason:
+                self.models[model_name]['reason'] = str(reason)[:200]
+            self._save()
+
+    def forget(self, model_name=None):
+        with self.lock:
+            if model_name is None:
+                self.models.clear()
+            else:
+                self.models.pop(model_name, None)
+            self._save()
+
+    def plan(self, src_lang, dest_lang, model_name):
+        # The hops a translation from src_lang to dest_lang takes, as a list of (src, dest) pairs.
+        # Unknown models are planned as direct; load_model records the outcome.
+        if self.is_missing(model_name) and src_lang.lower() != 'english' and dest_lang.lower() != 'english':
+            return [(src_lang, 'english'), ('english', dest_lang)]
+        return [(src_lang, dest_lang)]
+
+    def route_table(self):
+        with self.lock:
+            return {name: dict(entry) for name, entry in self.models.items()}
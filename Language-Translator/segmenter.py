@@ -0,0 +1,150 @@
+import re
+
+# Paragraphs are separated by blank lines
+PARAGRAPH_BREAK = re.compile(r'\n[ \t\r\f\v]*\n\s*')
+
+# Sentences end with terminal punctuation (Latin, CJK, Devanagari, Arabic) followed by whitespace,
+# or right after CJK punctuation which is usually not followed by a space
+SENTENCE_BREAK = re.compile(r'(?<=[.!?…])\s+|(?<=[.!?…]["\')\]])\s+|(?<=[。！？])\s*|(?<=[।؟])\s+')
+
+# Default token budget per segment, kept well under the 512 tokens the tokenizer truncates at
+DEFAULT_MAX_TOKENS = 256
+
+
+class Segment:
+    # A piece of the source text sent to the model as one unit.
+    # start/end are offsets into the original text so the translation can be put back in place.
+    __slots__ = ('start', 'end', 'text')
+
+    def __init__(self, start, end, text):
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __repr__(self):
+        return f"Segment({self.start}, {self.end}, {self.text!r})"
+
+
+def word_count_tokens(texts):
+    # Rough token counter used when no tokenizer is available
+    return [len(text.split()) + 1 for text in texts]
+
+
+def _spans(text, pattern, start, end):
+    # Split text[start:end] on pattern, returning (start, end) spans with surrounding whitespace trimmed
+    spans = []
+    position = start
+    for match in pattern.finditer(text, start, end):
+        spans.append((position, match.start()))
+        position = match.end()
+    spans.append((position, end))
+
+    trimmed = []
+    for span_start, span_end in spans:
+        while span_start < span_end and text[span_start].isspace():
+            span_start += 1
+        while span_end > span_start and text[span_end - 1].isspace():
+            span_end -= 1
+        if span_start < span_end:
+            trimmed.append((span_start, span_end))
+    return trimmed
+
+
+def _normalize(text):
+    # PDF extraction breaks lines mid-sentence; the model should see a single line of text
+    return ' '.join(text.split())
+
+
+def _split_long_sentence(text, start, end, count_tokens, max_tokens):
+    # A single sentence over the budget is split between words
+    words = [(match.start(), match.end()) for match in re.finditer(r'\S+', text[start:end])]
+    word_tokens = count_tokens([text[start + ws:start + we] for ws, we in words])
+
+    spans = []
+    piece_start = None
+    piece_end = None
+    piece_tokens = 0
+    for (word_start, word_end), tokens in zip(words, word_tokens):
+        if piece_start is not None and piece_tokens + tokens > max_tokens:
+            spans.append((piece_start, piece_end))
+            piece_start = None
+            piece_tokens = 0
+        if piece_start is None:
+            piece_start = start + word_start
+        piece_end = start + word_end
+        piece_tokens += tokens
+    if piece_start is not None:
+        spans.append((piece_start, piece_end))
+    return spans
+
+
+def split_sentences(text):
+    # One segment per sentence, without packing, for callers that translate and cache sentences
+    # individually (live translation of the text box)
+    segments = []
+    for paragraph_start, paragraph_end in _spans(text, PARAGRAPH_BREAK, 0, len(text)):
+        for start, end in _spans(text, SENTENCE_BREAK, paragraph_start, paragraph_end):
+            segments.append(Segment(start, end, _normalize(text[start:end])))
+    return segments
+
+
+def segment_text(text, count_tokens=None, max_tokens=DEFAULT_MAX_TOKENS):
+    # Split text on paragraph and sentence boundaries, then pack consecutive sentences
+    # of the same paragraph into segments of at most max_tokens tokens.
+    # count_tokens takes a list of strings and returns a list of token counts.
+    if count_tokens is None:
+        count_tokens = word_count_tokens
+
+    paragraphs = _spans(text, PARAGRAPH_BREAK, 0, len(text))
+    sentences_per_paragraph = [_spans(text, SENTENCE_BREAK, start, end) for start, end in paragraphs]
+
+    # Count all sentences in one call so the tokenizer can work in bulk
+    all_sentences = [span for sentences in sentences_per_paragraph for span in sentences]
+    all_counts = count_tokens([_normalize(text[start:end]) for start, end in all_sentences])
+    token_counts = dict(zip(all_sentences, all_counts))
+
+    segments = []
+    for sentences in sentences_per_paragraph:
+        segment_start = None
+        segment_end = None
+        segment_tokens = 0
+
+        for sentence_start, sentence_end in sentences:
+            tokens = token_counts[(sentence_start, sentence_end)]
+
+            if tokens > max_tokens:
+                # Flush what we have, then emit the oversized sentence in word-split pieces
+                if segment_start is not None:
+                    segments.append(Segment(segment_start, segment_end, _normalize(text[segment_start:segment_end])))
+                    segment_start = None
+                    segment_tokens = 0
+                for piece_start, piece_end in _split_long_sentence(text, sentence_start, sentence_end, count_tokens, max_tokens):
+                    segments.append(Segment(piece_start, piece_end, _normalize(text[piece_start:piece_end])))
+                continue
+
+            if segment_start is not None and segment_tokens + tokens > max_tokens:
+                segments.append(Segment(segment_start, segment_end, _normalize(text[segment_start:segment_end])))
+                segment_start = None
+                segment_tokens = 0
+
+            if segment_start is None:
+                segment_start = sentence_start
+            segment_end = sentence_end
+            segment_tokens += tokens
+
+        if segment_start is not None:
+            segments.append(Segment(segment_start, segment_end, _normalize(text[segment_start:segment_end])))
+
+    return segments
+
+
+def join_segments(text, segments, translations):
+    # Rebuild the document layout: translated segments separated by the original whitespace
+    parts = []
+    position = 0
+    for segment, translation in zip(segments, translations):
+        parts.append(text[position:segment.start])
+        parts.append(translation)
+        position = segment.end
+    parts.append(text[position:])
+    return ''.join(parts)
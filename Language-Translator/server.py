@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import functools
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Local HTTP translation service. Requests for the same language pair that arrive within a
+# short window are merged into one translate_batch call, so concurrent users share generate
+# calls instead of competing for the model.
+#
+#   python -m server --port 8765
+#   curl -X POST localhost:8765/translate -d '{"text": "Hello", "src": "english", "dest": "french", "decoding": "fast"}'
+#   curl localhost:8765/metrics
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class QueueFull(Exception):
+    pass
+
+
+class LatencyStats:
+    def __init__(self, window=10000):
+        self.latencies = deque(maxlen=window)
+        self.batch_sizes = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.batch_sizes['inf'] = 0
+        self.requests = 0
+        self.rejected = 0
+        self.batches = 0
+
+    def record_request(self, latency):
+        self.requests += 1
+        self.latencies.append(latency)
+
+    def record_batch(self, size):
+        self.batches += 1
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.batch_sizes[bucket] += 1
+                return
+        self.batch_sizes['inf'] += 1
+
+    def percentile(self, fraction):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self):
+        return {
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'latency_ms': {
+                'p50': round(self.percentile(0.50) * 1000, 2),
+                'p99': round(self.percentile(0.99) * 1000, 2),
+            },
+            'batch_size_histogram': {f"le_{bucket}": count for bucket, count in self.batch_sizes.items()},
+        }
+
+
+class MicroBatcher:
+    # Collects pending requests per language pair and flushes them as one batch when the
+    # batching window closes or the batch is full. Translation runs on a worker thread so the
+    # event loop keeps accepting requests while the model is busy.
+    def __init__(self, translator, window_ms=10, max_batch_segments=32, max_queue_segments=512, workers=1):
+        self.translator = translator
+        self.window = window_ms / 1000.0
+        self.max_batch_segments = max_batch_segments
+        self.max_queue_segments = max_queue_segments
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate")
+        self.queues = {}
+        self.flushers = {}
+        self.full_events = {}
+        self.queued_segments = 0
+        self.stats = LatencyStats()
+
+    async def translate(self, texts, src, dest, decoding=None):
+        # Returns the translations for texts once the batch containing them has run.
+        # Raises QueueFull when accepting the request would exceed the queue limit.
+        if self.queued_segments + len(texts) > self.max_queue_segments:
+            self.stats.rejected += 1
+            raise QueueFull()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pair = (src, dest, decoding)
+        self.queues.setdefault(pair, []).append((texts, future))
+        self.queued_segments += len(texts)
+
+        if pair not in self.flushers or self.flushers[pair].done():
+            self.full_events[pair] = asyncio.Event()
+            self.flushers[pair] = loop.create_task(self._flush_after_window(pair))
+        if sum(len(item[0]) for item in self.queues[pair]) >= self.max_batch_segments:
+            # A full batch does not wait for the window to close
+            self.full_events[pair].set()
+
+        return await future
+
+    async def _flush_after_window(self, pair):
+        try:
+            await asyncio.wait_for(self.full_events[pair].wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        await self._flush(pair)
+
+    async def _flush(self, pair):
+        while self.queues.get(pair):
+            # Take whole requests until the batch is full; the rest waits for the next round
+            pending = self.queues[pair]
+            batch = []
+            segments = 0
+            while pending and (not batch or segments + len(pending[0][0]) <= self.max_batch_segments):
+                item = pending.pop(0)
+                batch.append(item)
+                segments += len(item[0])
+
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            self.stats.record_batch(len(texts))
+            try:
+                loop = asyncio.get_running_loop()
+                # A single oversized request is admitted whole, so the model batch size keeps it in chunks
+                translations = await loop.run_in_executor(
+                    self.executor, functools.partial(self.translator.translate_batch, texts, pair[0], pair[1],
+                                                     self.max_batch_segments, decoding=pair[2])
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                # Hand each caller back its own slice of the batch
+                position = 0
+                for item_texts, future in batch:
+                    if not future.done():
+                        future.set_result(translations[position:position + len(item_texts)])
+                    position += len(item_texts)
+            finally:
+                self.queued_segments -= segments
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class TranslationServer:
+    def __init__(self, batcher, host="127.0.0.1", port=8765):
+        self.batcher = batcher
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        # Port 0 picks a free port; report the one actually bound
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.batcher.close()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except ValueError as e:
+                    # Malformed request line or headers: answer once and drop the connection
+                    self.write_response(writer, 400, {'error': f"invalid request: {e}"}, False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self.route(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self.write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        parts = request_line.decode('latin-1').split(' ', 2)
+        if len(parts) != 3:
+            raise ValueError("malformed request line")
+        method, path, _ = parts
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise ValueError("Content-Length is not a number") from None
+        if length < 0:
+            raise ValueError("negative Content-Length")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), path.split('?', 1)[0], headers, body
+
+    def write_response(self, writer, status, payload, keep_alive):
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                   500: 'Internal Server Error', 503: 'Service Unavailable'}
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = [
+            f"HTTP/1.1 {status} {reasons.get(status, 'OK')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode('latin-1') + body)
+
+    async def route(self, method, path, body):
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/metrics':
+            metrics = self.batcher.stats.snapshot()
+            metrics['queued_segments'] = self.batcher.queued_segments
+            return 200, metrics
+        if path != '/translate':
+            return 404, {'error': f"unknown path {path}"}
+        if method != 'POST':
+            return 405, {'error': "use POST"}
+
+        try:
+            request = json.loads(body or b'{}')
+            single = 'text' in request
+            texts = [request['text']] if single else request['texts']
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("'text' must be a string or 'texts' a list of strings")
+            from translator import language_name
+            src = language_name(request.get('src', 'english'))
+            dest = language_name(request['dest'])
+            decoding = request.get('decoding')
+            if decoding is not None:
+                from decoding import get_profile
+                get_profile(decoding)
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {'error': f"invalid request: {e}"}
+
+        start = time.perf_counter()
+        try:
+            translations = await self.batcher.translate(texts, src, dest, decoding)
+        except QueueFull:
+            return 503, {'error': "translation queue is full, retry later"}
+        except Exception as e:
+            return 500, {'error': f"translation failed: {e}"}
+        latency = time.perf_counter() - start
+        self.batcher.stats.record_request(latency)
+
+        response = {'latency_ms': round(latency * 1000, 2)}
+        if single:
+            response['translation'] = translations[0]
+        else:
+            response['translations'] = translations
+        return 200, response
+
+
+async def run_server(args):
+    from translator import get_translator
+
+    batcher = MicroBatcher(get_translator(), window_ms=args.window_ms, max_batch_segments=args.max_batch,
+                           max_queue_segments=args.max_queue, workers=args.workers)
+    server = await TranslationServer(batcher, args.host, args.port).start()
+    print(f"Translation service listening on http://{server.host}:{server.port}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m server", description="Local HTTP translation service with request batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--window-ms", type=float, default=10, help="how long to wait for more requests before running a batch (default: 10)")
+    parser.add_argument("--max-batch", type=int, default=32, help="maximum segments per generate call (default: 32)")
+    parser.add_argument("--max-queue", type=int, default=512, help="segments allowed to wait before requests are rejected with 503 (default: 512)")
+    parser.add_argument("--workers", type=int, default=1, help="batches translated concurrently (default: 1)")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(run_server(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
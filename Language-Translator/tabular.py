@@ -0,0 +1,206 @@
+import csv
+import json
+import os
+import time
+
+from segmenter import segment_text, join_segments, DEFAULT_MAX_TOKENS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Column translation for tabular files (product catalogues and the like): many short, often
+# repeated strings. Files are read in chunks of rows; each distinct cell value is translated once
+# per run, the new values of a chunk go to the model sorted by token length in large batches, and
+# the chunk is written back with the translated columns in the original row order.
+
+FORMATS = {'.csv': 'csv', '.tsv': 'tsv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet'}
+
+
+def table_format(path):
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"unsupported table format: {path} (expected {', '.join(sorted(FORMATS))})")
+    if fmt == 'parquet' and not PARQUET_AVAILABLE:
+        raise RuntimeError("Parquet support not available - pyarrow not installed")
+    return fmt
+
+
+class TableStats:
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.rows = 0
+        self.cells = 0
+        self.unique = 0
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self.start_time, 1e-9)
+        return {
+            'rows': self.rows,
+            'cells': self.cells,
+            'unique_values': self.unique,
+            # Share of non-empty cells that did not need their own translation
+            'dedup_ratio': round(1 - self.unique / self.cells, 4) if self.cells else 0.0,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(self.rows / elapsed, 2),
+            'cells_per_second': round(self.cells / elapsed, 2),
+        }
+
+
+class ColumnTranslator:
+    # Translations of every distinct value seen so far in this run, shared across chunks
+    def __init__(self, translator, src, dest, batch_size=64, decoding=None):
+        self.translator = translator
+        self.src = src
+        self.dest = dest
+        self.batch_size = batch_size
+        self.decoding = decoding
+        self.count_tokens = translator.get_token_counter(src, dest)
+        self.translations = {}
+
+    def translate_values(self, values, stats):
+        # values: cell values of one chunk (None and non-strings are left alone)
+        new_values = []
+        for value in values:
+            if isinstance(value, str) and value.strip():
+                stats.cells += 1
+                if value not in self.translations:
+                    self.translations[value] = None
+                    new_values.append(value)
+        if not new_values:
+            return
+
+        stats.unique += len(new_values)
+        token_counts = self.count_tokens(new_values)
+        order = sorted(range(len(new_values)), key=token_counts.__getitem__)
+        short_values = [new_values[i] for i in order if token_counts[i] <= DEFAULT_MAX_TOKENS]
+        long_values = [new_values[i] for i in order if token_counts[i] > DEFAULT_MAX_TOKENS]
+
+        translated = self.translator.translate_batch(short_values, self.src, self.dest, self.batch_size, decoding=self.decoding)
+        self.translations.update(zip(short_values, translated))
+
+        # Cells longer than the model's input limit are split on sentences like document text
+        for value in long_values:
+            segments = segment_text(value, self.count_tokens)
+            translated_segments = self.translator.translate_batch([segment.text for segment in segments], self.src, self.dest,
+                                                                  self.batch_size, decoding=self.decoding)
+            self.translations[value] = join_segments(value, segments, translated_segments)
+
+    def lookup(self, value):
+        if isinstance(value, str) and value.strip():
+            return self.translations[value]
+        return value
+
+
+def _delimited_chunks(path, delimiter, chunk_rows):
+    with open(path, newline='', encoding='utf-8') as source:
+        reader = csv.reader(source, delimiter=delimiter)
+        header = next(reader, None)
+        yield header
+        chunk = []
+        for row in reader:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _translate_delimited(input_path, output_path, columns, column_translator, stats, delimiter, chunk_rows, progress_callback):
+    chunks = _delimited_chunks(input_path, delimiter, chunk_rows)
+    header = next(chunks)
+    if header is None:
+        raise ValueError(f"{input_path} is empty")
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise ValueError(f"columns not found in {input_path}: {', '.join(missing)}")
+    indices = [header.index(column) for column in columns]
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as target:
+        writer = csv.writer(target, delimiter=delimiter)
+        writer.writerow(header)
+        for chunk in chunks:
+            column_translator.translate_values([row[i] for row in chunk for i in indices if i < len(row)], stats)
+            for row in chunk:
+                for i in indices:
+                    if i < len(row):
+                        row[i] = column_translator.lookup(row[i])
+            writer.writerows(chunk)
+            stats.rows += len(chunk)
+            if progress_callback:
+                progress_callback(stats)
+
+
+def _translate_jsonl(input_path, output_path, columns, column_translator, stats, chunk_rows, progress_callback):
+    # Records need not share keys, so a column only counts as missing once no record had it
+    seen_columns = set()
+
+    def flush(chunk, target):
+        column_translator.translate_values([record.get(column) for record in chunk for column in columns], stats)
+        for record in chunk:
+            for column in columns:
+                if column in record:
+                    seen_columns.add(column)
+                    record[column] = column_translator.lookup(record[column])
+            target.write(json.dumps(record, ensure_ascii=False) + "\n")
+        stats.rows += len(chunk)
+        if progress_callback:
+            progress_callback(stats)
+
+    with open(input_path, encoding='utf-8') as source, open(output_path, 'w', encoding='utf-8') as target:
+        chunk = []
+        for line in source:
+            if line.strip():
+                chunk.append(json.loads(line))
+                if len(chunk) >= chunk_rows:
+                    flush(chunk, target)
+                    chunk = []
+        if chunk:
+            flush(chunk, target)
+
+    missing = [column for column in columns if column not in seen_columns]
+    if missing:
+        os.remove(output_path)
+        raise ValueError(f"columns not found in {input_path}: {', '.join(missing)}")
+
+
+def _translate_parquet(input_path, output_path, columns, column_translator, stats, chunk_rows, progress_callback):
+    source = pq.ParquetFile(input_path)
+    missing = [column for column in columns if column not in source.schema_arrow.names]
+    if missing:
+        raise ValueError(f"columns not found in {input_path}: {', '.join(missing)}")
+
+    with pq.ParquetWriter(output_path, source.schema_arrow) as writer:
+        for batch in source.iter_batches(batch_size=chunk_rows):
+            values = {column: batch.column(column).to_pylist() for column in columns}
+            column_translator.translate_values([value for column_values in values.values() for value in column_values], stats)
+            arrays = [pa.array([column_translator.lookup(value) for value in values[name]], type=batch.schema.field(name).type)
+                      if name in values else batch.column(name) for name in batch.schema.names]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=batch.schema))
+            stats.rows += batch.num_rows
+            if progress_callback:
+                progress_callback(stats)
+
+
+def translate_table(input_path, output_path, columns, src, dest, text_translator, chunk_rows=10000, batch_size=64,
+                    decoding=None, progress_callback=None):
+    # Translates the given columns of a CSV/TSV/JSONL/Parquet file into output_path (same format)
+    # and returns the run's TableStats. progress_callback(stats) is called after every chunk.
+    fmt = table_format(input_path)
+    if table_format(output_path) != fmt:
+        raise ValueError("the output file must have the same format as the input file")
+
+    column_translator = ColumnTranslator(text_translator, src, dest, batch_size, decoding)
+    stats = TableStats()
+    if fmt in ('csv', 'tsv'):
+        _translate_delimited(input_path, output_path, columns, column_translator, stats, ',' if fmt == 'csv' else '\t',
+                             chunk_rows, progress_callback)
+    elif fmt == 'jsonl':
+        _translate_jsonl(input_path, output_path, columns, column_translator, stats, chunk_rows, progress_callback)
+    else:
+        _translate_parquet(input_path, output_path, columns, column_translator, stats, chunk_rows, progress_callback)
+    return stats
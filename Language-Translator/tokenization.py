@@ -0,0 +1,78 @@
+import threading
+from array import array
+from collections import OrderedDict
+
+from metrics import metrics
+
+# Tokenizer loading and a shared memo of encodings. Segments are encoded in bulk, one tokenizer
+# call per list, and each (tokenizer, segment) encoding is kept so token counting, pivots,
+# retries and multi-target jobs do not run the tokenizer on the same text again.
+
+# Longest input the models accept, in tokens (the end-of-sentence token included)
+MAX_INPUT_TOKENS = 512
+
+
+def load_tokenizer(source, **kwargs):
+    # Prefers a Rust-backed tokenizer when the model ships one (tokenizer.json); MarianMT
+    # checkpoints usually only have sentencepiece files and get the Python MarianTokenizer
+    from transformers import AutoTokenizer, MarianTokenizer
+
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(source, use_fast=True, **kwargs)
+        if tokenizer.is_fast or isinstance(tokenizer, MarianTokenizer):
+            return tokenizer
+    except Exception:
+        pass
+    return MarianTokenizer.from_pretrained(source, **kwargs)
+
+
+class EncodingCache:
+    # LRU of untruncated input ids keyed by (tokenizer key, segment). Ids are stored as int32
+    # arrays, about 4 bytes per token.
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _encode_arrays(self, tokenizer, key, texts):
+        results = [None] * len(texts)
+        missing = {}
+        with self.lock:
+            for i, text in enumerate(texts):
+                ids = self.entries.get((key, text))
+                if ids is not None:
+                    self.entries.move_to_end((key, text))
+                    results[i] = ids
+                else:
+                    missing.setdefault(text, []).append(i)
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+        metrics.increment('encoding_cache_hits_total', len(texts) - len(missing))
+        if not missing:
+            return results
+
+        # All new segments in one tokenizer call
+        metrics.increment('encoding_cache_misses_total', len(missing))
+        unique_texts = list(missing)
+        with metrics.timer('stage_seconds', stage='tokenize'):
+            encoded = tokenizer(unique_texts)["input_ids"]
+        with self.lock:
+            for text, ids in zip(unique_texts, encoded):
+                ids = array('i', ids)
+                self.entries[(key, text)] = ids
+                for i in missing[text]:
+                    results[i] = ids
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return results
+
+    def encode(self, tokenizer, key, texts, max_length=None):
+        # Input ids for each text, in order. key identifies the tokenizer (e.g. the model name).
+        # With max_length, longer encodings are cut the way the tokenizer truncates: content
+        # first, the final end-of-sentence token kept.
+        results = self._encode_arrays(tokenizer, key, texts)
+        if max_length is None:
+            return [list(ids) for ids in results]
+        return [list(ids) if len(ids) <= max_length else list(ids[:max_length - 1]) + [ids[-1]] for ids in results]
@@ -0,0 +1,203 @@
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_segment(text):
+    # Segments differing only in whitespace or Unicode composition share one cache entry
+    return unicodedata.normalize('NFC', ' '.join(text.split()))
+
+
+class TranslationMemory:
+    # Two-level cache of finished translations keyed by (model name, normalized segment):
+    # an in-process LRU in front of an SQLite store under the model cache directory.
+    def __init__(self, cache_dir, max_memory_entries=20000, max_disk_bytes=256 * 1024 * 1024,
+                 filename="translation_memory.sqlite"):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Hit/miss counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.db_path = os.path.join(cache_dir, filename)
+        self.db = None
+        self.disk_bytes = 0
+        try:
+            self.db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "model TEXT NOT NULL, source TEXT NOT NULL, translation TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_used REAL NOT NULL, PRIMARY KEY (model, source))"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS models (model TEXT PRIMARY KEY, revision TEXT NOT NULL)")
+            self.db.commit()
+            self.disk_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Translation memory disk store unavailable, using in-memory cache only: {e}")
+            self.db = None
+
+    def get_many(self, model_name, texts):
+        # Returns a list with the cached translation for each text, or None where there is no entry
+        keys = [normalize_segment(text) for text in texts]
+        results = [None] * len(keys)
+        missing = {}
+
+        with self.lock:
+            for i, key in enumerate(keys):
+                entry = self.memory.get((model_name, key))
+                if entry is not None:
+                    self.memory.move_to_end((model_name, key))
+                    results[i] = entry
+                    self.memory_hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+            if missing and self.db is not None:
+                found = self._disk_lookup(model_name, list(missing))
+                for key, translation in found.items():
+                    for i in missing.pop(key):
+                        results[i] = translation
+                        self.disk_hits += 1
+                    self._remember(model_name, key, translation)
+
+            self.misses += sum(len(indices) for indices in missing.values())
+
+        return results
+
+    def put_many(self, model_name, texts, translations):
+        rows = []
+        now = time.time()
+        with self.lock:
+            for text, translation in zip(texts, translations):
+                key = normalize_segment(text)
+                self._remember(model_name, key, translation)
+                rows.append((model_name, key, translation, len(key) + len(translation), now))
+
+            if rows and self.db is not None:
+                try:
+                    for model, key, _, _, _ in rows:
+                        previous = self.db.execute(
+                            "SELECT size FROM translations WHERE model = ? AND source = ?", (model, key)
+                        ).fetchone()
+                        if previous:
+                            self.disk_bytes -= previous[0]
+                    self.db.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)", rows)
+                    self.disk_bytes += sum(row[3] for row in rows)
+                    self._evict_disk()
+                    self.db.commit()
+                except sqlite3.Error as e:
+                    print(f"Could not write to translation memory: {e}")
+
+    def set_revision(self, model_name, revision):
+        # Drops every entry for model_name if it was produced by a different model revision
+        if not revision:
+            return
+        with self.lock:
+            if self.db is None:
+                return
+            row = self.db.execute("SELECT revision FROM models WHERE model = ?", (model_name,)).fetchone()
+            if row is not None and row[0] == revision:
+                return
+            if row is not None:
+                print(f"Model revision changed for {model_name}, invalidating cached translations")
+                self._invalidate(model_name)
+            self.db.execute("INSERT OR REPLACE INTO models VALUES (?, ?)", (model_name, revision))
+            self.db.commit()
+
+    def invalidate(self, model_name=None):
+        # Drops cached translations for one model, or everything when model_name is None
+        with self.lock:
+            self._invalidate(model_name)
+            if self.db is not None:
+                self.db.commit()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self.memory),
+                'disk_bytes': self.disk_bytes,
+                'evictions': self.evictions,
+            }
+
+    def close(self):
+        with self.lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
+
+    def _remember(self, model_name, key, translation):
+        self.memory[(model_name, key)] = translation
+        self.memory.move_to_end((model_name, key))
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def _disk_lookup(self, model_name, keys):
+        found = {}
+        try:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.db.execute(
+                    f"SELECT source, translation FROM translations WHERE model = ? AND source IN ({placeholders})",
+                    [model_name] + chunk,
+                ).fetchall()
+                found.update(rows)
+            if found:
+                self.db.executemany(
+                    "UPDATE translations SET last_used = ? WHERE model = ? AND source = ?",
+                    [(time.time(), model_name, key) for key in found],
+                )
+                self.db.commit()
+        except sqlite3.Error as e:
+            print(f"Could not read from translation memory: {e}")
+        return found
+
+    def _evict_disk(self):
+        # Remove least recently used rows until the store is back under its size limit
+        while self.disk_bytes > self.max_disk_bytes:
+            rows = self.db.execute(
+                "SELECT model, source, size FROM translations ORDER BY last_used LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                self.disk_bytes = 0
+                break
+            evicted = []
+            for model, source, size in rows:
+                evicted.append((model, source))
+                self.disk_bytes -= size
+                if self.disk_bytes <= self.max_disk_bytes:
+                    break
+            self.db.executemany("DELETE FROM translations WHERE model = ? AND source = ?", evicted)
+            self.evictions += len(evicted)
+
+    def _invalidate(self, model_name):
+        if model_name is None:
+            self.memory.clear()
+        else:
+            for key in [key for key in self.memory if key[0] == model_name]:
+                del self.memory[key]
+
+        if self.db is not None:
+            if model_name is None:
+                self.db.execute("DELETE FROM translations")
+                self.disk_bytes = 0
+            else:
+                self.db.execute("DELETE FROM translations WHERE model = ?", (model_name,))
+                self.disk_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()[0]
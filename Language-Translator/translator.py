@@ -1,10 +1,59 @@
-from transformers import MarianMTModel, MarianTokenizer
+from transformers import MarianMTModel
 import torch
 import os
+import logging
+import time
+import threading
 from pathlib import Path
+from segmenter import word_count_tokens
+from translation_memory import TranslationMemory, normalize_segment
+from model_registry import ModelRegistry
+from quantization import configure_threads, quantize_model, load_quantized, save_quantized, local_revision
+from routing import RoutePlanner, is_missing_model_error
+from model_store import ModelStore
+from tokenization import EncodingCache, load_tokenizer, MAX_INPUT_TOKENS
+from encoder_cache import EncoderCache, generate_with_encoder_cache
+from decoding import DEFAULT_DECODING_PROFILE, get_profile, generation_kwargs, bucket_batches
+from metrics import metrics, SIZE_BUCKETS
+
+# Per-call progress goes to this logger at DEBUG level; counters and stage timings go to metrics
+logger = logging.getLogger('translator')
+
+# Language code mappings (ISO language code to language name)
+LANGUAGE_CODE_MAP = {
+    'en': 'english', 'fr': 'french', 'de': 'german', 'es': 'spanish',
+    'it': 'italian', 'pt': 'portuguese', 'nl': 'dutch', 'ru': 'russian',
+    'zh': 'chinese', 'ar': 'arabic', 'hi': 'hindi', 'ja': 'japanese',
+    'ko': 'korean', 'tr': 'turkish', 'pl': 'polish', 'uk': 'ukrainian',
+    'vi': 'vietnamese', 'th': 'thai', 'ro': 'romanian', 'sv': 'swedish'
+}
+
+def language_name(language):
+    # Accepts an ISO code or a language name and returns the language name used throughout the app
+    language = language.strip().lower()
+    return LANGUAGE_CODE_MAP.get(language, language)
+
+def parse_language_pairs(spec, default_src='english'):
+    # "fr,english:de,es:hi" -> [('english', 'french'), ('english', 'german'), ('spanish', 'hindi')];
+    # a bare target means translating from default_src
+    pairs = []
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        src, _, dest = item.rpartition(':')
+        pairs.append((language_name(src) if src.strip() else default_src, language_name(dest)))
+    return pairs
 
 class TextTranslator:
-    def __init__(self):
+    def __init__(self, max_models=4, max_model_bytes=None, model_idle_ttl=900,
+                 inference_profile='default', intra_op_threads=None, inter_op_threads=None, cache_quantized=True,
+                 decoding_profile=DEFAULT_DECODING_PROFILE, cache_dir=None, offline=None, encoder_cache_bytes=64 * 1024 * 1024):
+        # inference_profile 'int8' quantizes Linear layers to int8 on CPU and runs under torch.inference_mode;
+        # 'default' keeps the fp32 weights and torch.no_grad.
+        # decoding_profile ('fast', 'balanced' or 'quality') is the default search setting, see decoding.py
+        # cache_dir holds the translation memory, route table and quantized models (default ~/.cache/language_translator_models)
+        # encoder_cache_bytes caps the encoder outputs kept for re-decoding the same segments (0 turns it off)
+        # offline disables downloads; it defaults to on when TRANSLATOR_OFFLINE or HF_HUB_OFFLINE is set to 1
         try:
             # Try to import required deep learning modules
             import transformers
@@ -15,24 +64,53 @@ class TextTranslator:
             print("TextTranslator initialized in fallback mode - transformers not available")
             return
 
-        self.models = {}
-        self.tokenizers = {}
-        self.model_cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "language_translator_models")
+        # Loaded models, capped by count/bytes and unloaded after model_idle_ttl seconds unused
+        self.registry = ModelRegistry(max_models=max_models, max_bytes=max_model_bytes, idle_ttl=model_idle_ttl)
+        self.model_cache_dir = cache_dir or os.path.join(os.path.expanduser("~"), ".cache", "language_translator_models")
         Path(self.model_cache_dir).mkdir(parents=True, exist_ok=True)
         
+        # Cache of finished translations shared across runs, keyed by model and segment
+        self.memory = TranslationMemory(self.model_cache_dir)
+        
+        # Input ids of recently seen segments per model, shared by token counting and translation
+        self.encodings = EncodingCache()
+        
+        # Encoder outputs per segment, reused when the same model decodes a segment again
+        self.encoder_cache = EncoderCache(encoder_cache_bytes) if encoder_cache_bytes else None
+        
+        # Which direct models exist, so missing ones are not probed on every call
+        self.routes = RoutePlanner(self.model_cache_dir)
+        
+        # Models installed with `python -m model_store`, loaded without any network lookup
+        self.store = ModelStore(self.model_cache_dir)
+        if offline is None:
+            offline = os.environ.get('TRANSLATOR_OFFLINE') == '1' or os.environ.get('HF_HUB_OFFLINE') == '1'
+        self.offline = offline
+        # Models found missing in offline mode, with the model store state and the error; they are
+        # not probed again in this process until a model is imported into the store
+        self.offline_missing = {}
+        
         # Language code mappings (ISO language code to language name)
-        self.language_code_map = {
-            'en': 'english', 'fr': 'french', 'de': 'german', 'es': 'spanish',
-            'it': 'italian', 'pt': 'portuguese', 'nl': 'dutch', 'ru': 'russian',
-            'zh': 'chinese', 'ar': 'arabic', 'hi': 'hindi', 'ja': 'japanese',
-            'ko': 'korean', 'tr': 'turkish', 'pl': 'polish', 'uk': 'ukrainian',
-            'vi': 'vietnamese', 'th': 'thai', 'ro': 'romanian', 'sv': 'swedish'
-        }
+        self.language_code_map = dict(LANGUAGE_CODE_MAP)
         self.reverse_language_code_map = {v: k for k, v in self.language_code_map.items()}
         
+        # Running totals of translated work, used for throughput reports
+        self.stats_lock = threading.Lock()
+        self.stats = {'segments': 0, 'tokens_in': 0, 'tokens_out': 0, 'tokenize_seconds': 0.0, 'generate_seconds': 0.0}
+        
         # Device configuration
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         print(f"Using device: {self.device}")
+        
+        # CPU inference settings
+        configure_threads(intra_op_threads, inter_op_threads)
+        self.inference_profile = inference_profile
+        get_profile(decoding_profile)
+        self.decoding_profile = decoding_profile
+        self.cache_quantized = cache_quantized
+        if self.inference_profile == 'int8' and self.device.type != 'cpu':
+            print("int8 quantization is only supported on CPU, using the default profile")
+            self.inference_profile = 'default'
     
     def get_model_name(self, src_lang, dest_lang):
         # Get the ISO language codes
@@ -50,102 +128,355 @@ class TextTranslator:
     
     def load_model(self, src_lang, dest_lang):
         if self.fallback_mode:
-            print("Cannot load models in fallback mode")
+            logger.debug("Cannot load models in fallback mode")
             return None, None
             
         model_key = f"{src_lang}_{dest_lang}"
         
         # If model is already loaded, return it
-        if model_key in self.models and model_key in self.tokenizers:
-            print(f"Using cached model for {src_lang} to {dest_lang}")
-            return self.models[model_key], self.tokenizers[model_key]
+        cached = self.registry.get(model_key)
+        if cached is not None:
+            metrics.increment('model_cache_hits_total')
+            logger.debug("Using cached model for %s to %s", src_lang, dest_lang)
+            return cached
+        metrics.increment('model_cache_misses_total')
+        
+        model_name = self.get_model_name(src_lang, dest_lang)
+        reason = self._known_missing(model_name)
+        if reason is not None:
+            # Known to be unavailable: no probe, go straight to the fallback
+            metrics.increment('missing_model_skips_total')
+            if src_lang.lower() != 'english' and dest_lang.lower() != 'english':
+                return None, None
+            raise ValueError(f"Could not load translation model for {src_lang} to {dest_lang}: {reason}")
         
         try:
-            # Try to get a direct translation model
-            model_name = self.get_model_name(src_lang, dest_lang)
-            print(f"Loading model: {model_name}")
+            # Only one thread loads a given pair; others wait and reuse its result
+            with metrics.timer('stage_seconds', stage='load'):
+                model, tokenizer = self.registry.get_or_load(model_key, lambda: self._load_pretrained(src_lang, dest_lang))
+            self.routes.record(model_name, True)
+            return model, tokenizer
+        except Exception as e:
+            if is_missing_model_error(e):
+                # Expected for pairs without a direct model; logged rather than printed on every call
+                logger.debug("No direct translation model %s: %s", model_name, e)
+                self.routes.record(model_name, False, e)
+            elif self.offline and isinstance(e, LookupError):
+                # Not installed and downloads are off; only this process remembers it
+                logger.debug("%s", e)
+                self.offline_missing[model_name] = (self.store.manifest_state(), str(e))
+            else:
+                print(f"Error loading direct translation model: {e}")
             
-            # Try to find a pre-downloaded model to handle offline scenarios
+            # Fallback to English as intermediate language if direct translation not available
+            if src_lang.lower() != 'english' and dest_lang.lower() != 'english':
+                logger.debug("Will try translating %s to %s through English instead", src_lang, dest_lang)
+                return None, None
+            else:
+                raise ValueError(f"Could not load translation model for {src_lang} to {dest_lang}: {str(e)}")
+
+    def _known_missing(self, model_name):
+        # Why model_name is known to be unavailable, or None if it should be loaded
+        if self.routes.is_missing(model_name):
+            return f"{model_name} is recorded as unavailable"
+        entry = self.offline_missing.get(model_name)
+        if entry is None:
+            return None
+        if entry[0] != self.store.manifest_state():
+            # The store changed since; the model may have been installed
+            self.offline_missing.pop(model_name, None)
+            return None
+        return entry[1]
+
+    def prewarm(self, src_lang, dest_lang):
+        # Loads the models a pair needs, both hops for pairs routed through English, so the first
+        # translation does not pay for loading. Raises if a model cannot be loaded.
+        if self.fallback_mode:
+            return
+        model, tokenizer = self.load_model(src_lang, dest_lang)
+        if model is None:
+            self.load_model(src_lang, 'english')
+            self.load_model('english', dest_lang)
+
+    def _load_pretrained(self, src_lang, dest_lang):
+        # Try to get a direct translation model
+        model_name = self.get_model_name(src_lang, dest_lang)
+        print(f"Loading model: {model_name}")
+        
+        # Installed models resolve straight from the store's manifest; a damaged install raises
+        installed = self.store.resolve(model_name)
+        revision = installed[1] if installed else None
+        
+        # A previously quantized copy skips both the fp32 load and the conversion
+        model = None
+        if self.inference_profile == 'int8' and self.cache_quantized:
+            model = load_quantized(self.model_cache_dir, model_name, revision)
+        
+        if installed:
+            tokenizer = load_tokenizer(installed[0], local_files_only=True)
+            if model is None:
+                model = MarianMTModel.from_pretrained(installed[0], local_files_only=True)
+            print(f"Loaded model from model store: {model_name}")
+        else:
             try:
-                # First attempt to load from cache
-                tokenizer = MarianTokenizer.from_pretrained(model_name, cache_dir=self.model_cache_dir, local_files_only=True)
-                model = MarianMTModel.from_pretrained(model_name, cache_dir=self.model_cache_dir, local_files_only=True)
+                # Then the Hugging Face cache, still without network access
+                tokenizer = load_tokenizer(model_name, cache_dir=self.model_cache_dir, local_files_only=True)
+                if model is None:
+                    model = MarianMTModel.from_pretrained(model_name, cache_dir=self.model_cache_dir, local_files_only=True)
                 print(f"Loaded model from local cache: {model_name}")
             except Exception as cache_error:
-                print(f"Model not found in cache, downloading: {model_name}")
+                if self.offline:
+                    raise LookupError(f"{model_name} is not installed and downloads are disabled (offline mode). "
+                                      f"Install it with: python -m model_store import <model directory> --name {model_name}") from cache_error
+                print(f"Model not found in cache ({cache_error}), downloading: {model_name}")
                 # If not in cache, download from Hugging Face
-                tokenizer = MarianTokenizer.from_pretrained(model_name, cache_dir=self.model_cache_dir)
+                tokenizer = load_tokenizer(model_name, cache_dir=self.model_cache_dir)
                 model = MarianMTModel.from_pretrained(model_name, cache_dir=self.model_cache_dir)
                 print(f"Downloaded model: {model_name}")
+        
+        if self.inference_profile == 'int8' and not getattr(model, 'is_int8_quantized', False):
+            print(f"Quantizing {model_name} to int8")
+            model = quantize_model(model)
+            model.is_int8_quantized = True
+            if self.cache_quantized:
+                save_quantized(self.model_cache_dir, model_name, model, revision)
+        
+        # Move model to the appropriate device (GPU if available)
+        model.to(self.device)
+        model.eval()
+        print(f"Model loaded and moved to {self.device}")
+        
+        # Cached translations from an older revision of this model are no longer valid
+        # (transformers 5 leaves config._commit_hash unset, so read the cached snapshot's ref)
+        revision = (revision or getattr(model.config, '_commit_hash', None)
+                    or local_revision(self.model_cache_dir, model_name) or model_name)
+        for decoding in ('fast', 'balanced', 'quality'):
+            self.memory.set_revision(self._memory_model_name(src_lang, dest_lang, decoding), revision)
+        
+        return model, tokenizer
+
+    def _memory_model_name(self, src_lang, dest_lang, decoding):
+        # int8 output and non-default decoding can differ from fp32 full-beam output,
+        # so each combination keeps separate translation memory entries
+        model_name = self.get_model_name(src_lang, dest_lang)
+        if self.inference_profile == 'int8':
+            model_name += ':int8'
+        if decoding != 'quality':
+            model_name += ':' + decoding
+        return model_name
+
+    def model_memory_report(self):
+        # Resident models with their weight size in MB and idle time
+        if self.fallback_mode:
+            return []
+        return self.registry.memory_report()
+
+    def get_token_counter(self, src_lang, dest_lang):
+        # Returns a function counting source tokens for a list of texts with the pair's tokenizer,
+        # used to size segments against the model's input limit
+        if not self.fallback_mode:
+            try:
+                model, tokenizer = self.load_model(src_lang, dest_lang)
+                model_name = self.get_model_name(src_lang, dest_lang)
+                if tokenizer is None and src_lang.lower() != 'english':
+                    # Pivot pairs are fed to the source-to-English model first
+                    model, tokenizer = self.load_model(src_lang, 'english')
+                    model_name = self.get_model_name(src_lang, 'english')
+                if tokenizer is not None:
+                    # Counting encodes the sentences, so translating them later reuses the encodings
+                    return lambda texts: [len(ids) for ids in self._encode(tokenizer, model_name, texts)] if texts else []
+            except Exception as e:
+                print(f"Could not load tokenizer for {src_lang} to {dest_lang}, estimating token counts: {e}")
+        return word_count_tokens
+
+    def plan_route(self, src_lang, dest_lang):
+        # The hops used for a pair: [(src, dest)] or, when the direct model is known to be missing,
+        # [(src, 'english'), ('english', dest)]
+        return self.routes.plan(src_lang, dest_lang, self.get_model_name(src_lang, dest_lang))
+
+    def translate_batch_multi(self, texts, src_lang, dest_langs, batch_size=16, decoding=None):
+        # Translates the same texts into several languages, returning {dest_lang: translations}.
+        # Targets without a direct model share a single batched source-to-English pass.
+        results = {}
+        english_texts = None
+        for dest_lang in dest_langs:
+            if src_lang.lower() == 'english' or dest_lang.lower() == 'english' or self.fallback_mode:
+                results[dest_lang] = self.translate_batch(texts, src_lang, dest_lang, batch_size, decoding=decoding)
+                continue
             
-            # Move model to the appropriate device (GPU if available)
-            model.to(self.device)
-            print(f"Model loaded and moved to {self.device}")
-            
-            # Cache the model and tokenizer
-            self.models[model_key] = model
-            self.tokenizers[model_key] = tokenizer
-            
-            return model, tokenizer
-        except Exception as e:
-            print(f"Error loading direct translation model: {e}")
+            model, tokenizer = self.load_model(src_lang, dest_lang)
+            if model is not None:
+                results[dest_lang] = self.translate_batch(texts, src_lang, dest_lang, batch_size, decoding=decoding)
+                continue
             
-            # Fallback to English as intermediate language if direct translation not available
-            if src_lang.lower() != 'english' and dest_lang.lower() != 'english':
-                print(f"Will try translating through English instead")
-                return None, None
-            else:
-                raise ValueError(f"Could not load translation model for {src_lang} to {dest_lang}: {str(e)}")
+            if english_texts is None:
+                logger.debug("Translating %d segments from %s to English once for all pivot targets", len(texts), src_lang)
+                english_texts = self.translate_batch(texts, src_lang, 'english', batch_size, decoding=decoding)
+            results[dest_lang] = self.translate_batch(english_texts, 'english', dest_lang, batch_size, decoding=decoding)
+        return results
 
-    def translate_text(self, text, src_lang, dest_lang):
+    def translate_text(self, text, src_lang, dest_lang, decoding=None):
         # Fallback mode translation
         if self.fallback_mode:
-            print(f"Using fallback translation mode for {src_lang} to {dest_lang}")
+            logger.debug("Using fallback translation mode for %s to %s", src_lang, dest_lang)
             return f"[FALLBACK MODE] Translation from {src_lang} to {dest_lang} would go here.\n\nOriginal text:\n{text}\n\nPlease install all required dependencies to enable actual translation."
             
         # If text is empty, return empty string
         if not text.strip():
             return ""
             
-        print(f"Starting translation from {src_lang} to {dest_lang}")
+        logger.debug("Starting translation from %s to %s", src_lang, dest_lang)
+        return self.translate_batch([text], src_lang, dest_lang, decoding=decoding)[0]
+
+    def translate_batch(self, texts, src_lang, dest_lang, batch_size=16, progress_callback=None, decoding=None):
+        # Fallback mode translation
+        if self.fallback_mode:
+            return [self.translate_text(text, src_lang, dest_lang) for text in texts]
+
+        results = [""] * len(texts)
+        decoding = decoding or self.decoding_profile
+        get_profile(decoding)
+
+        # Empty segments translate to empty strings and never reach the model
+        pending = [i for i, text in enumerate(texts) if text.strip()]
+        if not pending:
+            return results
         
+        with self.stats_lock:
+            self.stats['segments'] += len(pending)
+        metrics.increment('segments_total', len(pending))
+
         try:
             # Try to load a direct translation model
-            print(f"Attempting to load model for {src_lang} to {dest_lang}")
+            logger.debug("Attempting to load model for %s to %s", src_lang, dest_lang)
             model, tokenizer = self.load_model(src_lang, dest_lang)
-            
-            # If direct translation is not available, try translation through English
-            if model is None and tokenizer is None:
-                print(f"No direct model available for {src_lang} to {dest_lang}")
-                if src_lang.lower() != 'english' and dest_lang.lower() != 'english':
-                    # First translate from source to English
-                    print(f"No direct model for {src_lang} to {dest_lang}, translating via English")
-                    english_text = self.translate_text(text, src_lang, 'english')
-                    # Then translate from English to destination
-                    return self.translate_text(english_text, 'english', dest_lang)
-                else:
-                    return "Translation not available for this language pair."
-            
-            # Perform translation
+        except Exception as e:
+            print(f"Translation error during model loading: {e}")
+            for i in pending:
+                results[i] = f"Translation error: {str(e)}"
+            return results
+
+        # If direct translation is not available, try translation through English
+        if model is None and tokenizer is None:
+            if src_lang.lower() != 'english' and dest_lang.lower() != 'english':
+                logger.debug("No direct model for %s to %s, translating via English", src_lang, dest_lang)
+                metrics.increment('pivot_batches_total')
+                # Both hops run batched over the whole segment list
+                english_texts = self.translate_batch([texts[i] for i in pending], src_lang, 'english', batch_size, decoding=decoding)
+                translated = self.translate_batch(english_texts, 'english', dest_lang, batch_size, decoding=decoding)
+                for i, translated_text in zip(pending, translated):
+                    results[i] = translated_text
+                if progress_callback:
+                    progress_callback(len(pending), len(pending))
+                return results
+            for i in pending:
+                results[i] = "Translation not available for this language pair."
+            return results
+
+        # Reuse translations of segments seen before with this model
+        model_name = self._memory_model_name(src_lang, dest_lang, decoding)
+        cached = self.memory.get_many(model_name, [texts[i] for i in pending])
+        
+        # Identical segments are only translated once
+        to_translate = {}
+        for i, translation in zip(pending, cached):
+            if translation is not None:
+                results[i] = translation
+            else:
+                to_translate.setdefault(normalize_segment(texts[i]), []).append(i)
+        misses = sum(len(indices) for indices in to_translate.values())
+        metrics.increment('memory_hits_total', len(pending) - misses)
+        metrics.increment('memory_misses_total', misses)
+        metrics.increment('duplicate_segments_total', misses - len(to_translate))
+        
+        if not to_translate:
+            logger.debug("All %d segments found in translation memory", len(pending))
+            if progress_callback:
+                progress_callback(len(pending), len(pending))
+            return results
+        
+        # Tokenize every segment once (or reuse earlier encodings), then batch by length bucket
+        # so each padded batch holds segments of similar size
+        unique_texts = list(to_translate)
+        input_ids = self._encode(tokenizer, self.get_model_name(src_lang, dest_lang), unique_texts, MAX_INPUT_TOKENS)
+        batches = bucket_batches([len(ids) for ids in input_ids], batch_size)
+        
+        done = 0
+        for indices in batches:
+            batch_texts = [unique_texts[i] for i in indices]
             try:
-                print(f"Tokenizing text for translation")
-                # Tokenize the text
-                batch = tokenizer([text], return_tensors="pt", padding=True, truncation=True, max_length=512)
-                batch = {k: v.to(self.device) for k, v in batch.items()}
-                
-                print(f"Generating translation")
-                # Generate translation
-                with torch.no_grad():
-                    generated_ids = model.generate(**batch)
-                
-                print(f"Decoding translation")
-                # Decode the generated tokens
-                translated_text = tokenizer.batch_decode(generated_ids, skip_special_tokens=True)[0]
-                print(f"Translation complete")
-                return translated_text
+                translated = self._generate_batch(batch_texts, model, tokenizer, decoding, [input_ids[i] for i in indices],
+                                                  f"{self.get_model_name(src_lang, dest_lang)}:{self.inference_profile}")
+                self.memory.put_many(model_name, batch_texts, translated)
             except Exception as e:
                 print(f"Translation error during processing: {e}")
-                return f"Translation error: {str(e)}"
-        except Exception as e:
-            print(f"Translation error during model loading: {e}")
-            return f"Translation error: {str(e)}"
+                translated = [f"Translation error: {str(e)}"] * len(batch_texts)
+            
+            # Put results back in their original positions
+            for text, translated_text in zip(batch_texts, translated):
+                for i in to_translate[text]:
+                    results[i] = translated_text
+            
+            done += len(batch_texts)
+            if progress_callback:
+                progress_callback(done, len(unique_texts))
+        
+        return results
+
+    def _encode(self, tokenizer, model_name, texts, max_length=None):
+        # Bulk encoding through the shared encoding cache; the time is counted apart from generation
+        start = time.perf_counter()
+        input_ids = self.encodings.encode(tokenizer, model_name, texts, max_length)
+        with self.stats_lock:
+            self.stats['tokenize_seconds'] += time.perf_counter() - start
+        return input_ids
+
+    def _generate_batch(self, texts, model, tokenizer, decoding=None, input_ids=None, model_key=None):
+        # model_key names the model for the encoder cache; without it the encoder always runs
+        logger.debug("Translating a batch of %d segments", len(texts))
+        with metrics.timer('stage_seconds', stage='tokenize'):
+            if input_ids is None:
+                # Tokenize all segments together, padded to the longest one in the batch
+                batch = tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=512)
+            else:
+                # Already tokenized by the caller, only pad
+                batch = tokenizer.pad({"input_ids": input_ids}, return_tensors="pt")
+            batch = {k: v.to(self.device) for k, v in batch.items()}
+
+        # Generate translation, with the output length capped relative to the longest source
+        kwargs = generation_kwargs(decoding or self.decoding_profile, batch['input_ids'].shape[1])
+        grad_context = torch.inference_mode if self.inference_profile == 'int8' else torch.no_grad
+        start = time.perf_counter()
+        with metrics.timer('stage_seconds', stage='generate'), grad_context():
+            if self.encoder_cache is not None and model_key is not None and tokenizer.padding_side == 'right':
+                generated_ids = generate_with_encoder_cache(model, self.encoder_cache, model_key, batch, **kwargs)
+            else:
+                generated_ids = model.generate(**batch, **kwargs)
+        generate_seconds = time.perf_counter() - start
+
+        tokens_in = int(batch['attention_mask'].sum())
+        tokens_out = int((generated_ids != tokenizer.pad_token_id).sum())
+        with self.stats_lock:
+            self.stats['tokens_in'] += tokens_in
+            self.stats['tokens_out'] += tokens_out
+            self.stats['generate_seconds'] += generate_seconds
+        metrics.increment('tokens_in_total', tokens_in)
+        metrics.increment('tokens_out_total', tokens_out)
+        metrics.observe('batch_segments', len(texts), SIZE_BUCKETS)
+        
+        # Decode the generated tokens
+        with metrics.timer('stage_seconds', stage='decode'):
+            translated_texts = tokenizer.batch_decode(generated_ids, skip_special_tokens=True)
+        return translated_texts
+
+
+# Shared instance so the GUI, PDF utilities and CLI do not each load their own models
+_shared_translator = None
+_shared_translator_lock = threading.Lock()
+
+def get_translator():
+    global _shared_translator
+    with _shared_translator_lock:
+        if _shared_translator is None:
+            _shared_translator = TextTranslator()
+        return _shared_translator